@@ -9,6 +9,8 @@ interface Stat {
   year?: string
   count: number
   ip_data?: {ip_address: string, visit_count: number}[]
+  ip_count?: number
+  ip_others?: number
 }
 
 export default function AnalyticsPage() {
@@ -237,13 +239,18 @@ export default function AnalyticsPage() {
                   <tr key={i} className="hover:bg-gray-50">
                     <td className="border p-3">{formatDate(stat)}</td>
                     <td className="border p-3 font-semibold">{stat.count}</td>
-                    <td className="border p-3 font-semibold text-green-600">{stat.ip_data?.length || 0}</td>
+                    <td className="border p-3 font-semibold text-green-600">{stat.ip_count ?? stat.ip_data?.length ?? 0}</td>
                     <td className="border p-3 text-gray-600 text-sm">
                       {stat.ip_data?.map((ip, idx) => (
                         <span key={idx} className="inline-block mr-3 mb-1">
                           {ip.ip_address} <span className="font-semibold text-blue-600">({ip.visit_count})</span>
                         </span>
                       )) || '-'}
+                      {!!stat.ip_others && (
+                        <span className="inline-block mr-3 mb-1 text-gray-400">
+                          +{stat.ip_count! - (stat.ip_data?.length || 0)} more ({stat.ip_others})
+                        </span>
+                      )}
                     </td>
                   </tr>
                 ))}
@@ -0,0 +1,196 @@
+"""Offline IP -> (country, city) lookups from a memory-mapped range table.
+
+The table is built by ``manage.py import_geoip`` from a CSV or MMDB dump and
+written to ``GEOIP_DATABASE``::
+
+    header      magic, IPv4 range count, IPv6 range count, location count
+    IPv4 ranges start (4 bytes), end (4 bytes), location index; sorted by start
+    IPv6 ranges start (16 bytes), end (16 bytes), location index; sorted by start
+    locations   offsets into the string blob, then "country\\0city" UTF-8 strings
+
+Addresses are stored big-endian, so comparing the raw bytes compares the
+addresses and a lookup is a binary search over the mapped file. Workers share
+the pages through the OS cache and pick up a new table when the file changes.
+"""
+import ipaddress
+import logging
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'I8GEOIP1'
+HEADER = struct.Struct('>8sIII')
+RECORDS = {4: struct.Struct('>4s4sI'), 6: struct.Struct('>16s16sI')}
+OFFSET = struct.Struct('>I')
+
+IPV4_MAPPED_PREFIX = bytes(10) + b'\xff\xff'
+
+# How often a worker checks whether the table file was replaced
+RELOAD_INTERVAL = 60
+
+
+def pack_address(ip):
+    """Big-endian bytes of an address string (4 for IPv4, 16 for IPv6), or None."""
+    try:
+        return socket.inet_pton(socket.AF_INET, ip)
+    except (OSError, TypeError):
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, ip)
+    except (OSError, TypeError):
+        return None
+    return packed[12:] if packed[:12] == IPV4_MAPPED_PREFIX else packed
+
+
+def parse_address(value):
+    """An ``ipaddress`` address from text or an integer, IPv4-mapped IPv6 unwrapped."""
+    value = str(value).strip()
+    address = ipaddress.ip_address(int(value) if value.isdigit() else value)
+    if address.version == 6 and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+
+class GeoIPDatabase:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, v4_count, v6_count, self.location_count = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a GeoIP range table')
+        offset = HEADER.size
+        # Address width -> (record layout, first record offset, record count)
+        self._tables = {}
+        for version, count in ((4, v4_count), (6, v6_count)):
+            record = RECORDS[version]
+            self._tables[(record.size - 4) // 2] = (record, offset, count)
+            offset += count * record.size
+        self._offsets = offset
+        self._strings = offset + (self.location_count + 1) * OFFSET.size
+        self._locations = {}
+
+    def __len__(self):
+        return sum(count for record, offset, count in self._tables.values())
+
+    def location(self, index):
+        location = self._locations.get(index)
+        if location is None:
+            start, = OFFSET.unpack_from(self._buffer, self._offsets + index * OFFSET.size)
+            end, = OFFSET.unpack_from(self._buffer, self._offsets + (index + 1) * OFFSET.size)
+            country, city = self._buffer[self._strings + start:self._strings + end].decode().split('\0')
+            location = self._locations[index] = (country, city)
+        return location
+
+    def lookup(self, ip):
+        """``(country, city)`` of ``ip``, or None if no range holds it."""
+        packed = pack_address(ip)
+        if packed is None:
+            return None
+        width = len(packed)
+        record, offset, count = self._tables[width]
+        buffer, size = self._buffer, record.size
+        # Last range starting at or before the address
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            position = offset + middle * size
+            if packed < buffer[position:position + width]:
+                high = middle
+            else:
+                low = middle + 1
+        if low == 0:
+            return None
+        start, end, location = record.unpack_from(buffer, offset + (low - 1) * size)
+        if packed > end:
+            return None
+        return self.location(location)
+
+    def close(self):
+        self._buffer.close()
+
+
+def write_database(path, ranges):
+    """Write ``(first, last, country, city)`` address ranges to ``path`` as a range table.
+
+    Adjacent ranges with the same location are merged and ranges overlapping
+    an earlier one are dropped. The file is replaced atomically. Returns
+    ``(IPv4 ranges, IPv6 ranges, locations, dropped)``.
+    """
+    locations = {}
+    tables = {4: [], 6: []}
+    for first, last, country, city in ranges:
+        if first.version != last.version or first > last:
+            continue
+        location = locations.setdefault((country or '', city or ''), len(locations))
+        tables[first.version].append((int(first), int(last), location))
+
+    dropped = 0
+    for version, rows in tables.items():
+        rows.sort()
+        merged = []
+        for first, last, location in rows:
+            if merged and first <= merged[-1][1]:
+                dropped += 1
+                continue
+            if merged and first == merged[-1][1] + 1 and location == merged[-1][2]:
+                merged[-1][1] = last
+            else:
+                merged.append([first, last, location])
+        tables[version] = merged
+
+    strings = [f'{country}\0{city}'.encode() for country, city in locations]
+    tmp_path = f'{path}.tmp'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(tables[4]), len(tables[6]), len(strings)))
+        for version, width in ((4, 4), (6, 16)):
+            record = RECORDS[version]
+            for first, last, location in tables[version]:
+                f.write(record.pack(first.to_bytes(width, 'big'), last.to_bytes(width, 'big'), location))
+        offset = 0
+        f.write(OFFSET.pack(offset))
+        for value in strings:
+            offset += len(value)
+            f.write(OFFSET.pack(offset))
+        f.write(b''.join(strings))
+    os.replace(tmp_path, path)
+    return len(tables[4]), len(tables[6]), len(strings), dropped
+
+
+_state = {'database': None, 'mtime': None, 'checked': None}
+_state_lock = threading.Lock()
+
+
+def get_database():
+    """The table at ``GEOIP_DATABASE``, reopened when the file changes; None if there is none."""
+    now = time.monotonic()
+    if _state['checked'] is not None and now - _state['checked'] < RELOAD_INTERVAL:
+        return _state['database']
+    with _state_lock:
+        try:
+            mtime = os.stat(settings.GEOIP_DATABASE).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != _state['mtime']:
+            # The old mapping stays valid for lookups still using it
+            try:
+                _state['database'] = GeoIPDatabase(settings.GEOIP_DATABASE) if mtime else None
+            except (OSError, ValueError, struct.error):
+                logger.exception('Could not open the GeoIP table %s', settings.GEOIP_DATABASE)
+                _state['database'] = None
+            _state['mtime'] = mtime
+        _state['checked'] = now
+    return _state['database']
+
+
+def lookup(ip):
+    """``(country, city)`` of ``ip``; empty strings when it isn't in the table or there is none."""
+    database = get_database()
+    location = database.lookup(ip) if database is not None else None
+    return location or ('', '')
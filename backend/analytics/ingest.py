@@ -0,0 +1,146 @@
+"""In-process buffer that writes page visits in batches off the request path.
+
+``track_visit`` only validates and enqueues; a background thread per worker
+``bulk_create``s what has accumulated once ``ANALYTICS_BATCH_SIZE`` visits are
+waiting or ``ANALYTICS_FLUSH_INTERVAL`` seconds have passed, in one transaction.
+The buffer holds at most ``ANALYTICS_BUFFER_SIZE`` visits. When it is full the
+request thread flushes it itself (backpressure), and if that fails too the
+visit is dropped. Both are counted in ``stats()``. Whatever is still buffered
+is written when the worker exits. Visits stamped before the last analytics
+reset (``VisitReset``) are discarded, so a reset also covers what other
+workers had buffered.
+
+With ``ANALYTICS_INGEST = 'segments'`` visits go to the segment log instead
+(see ``segments``), and ``'database'`` inserts each one as it arrives.
+"""
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from . import rollups
+from .models import PageVisit, VisitReset
+from .segments import segment_log
+
+logger = logging.getLogger(__name__)
+
+
+class VisitBuffer:
+    def __init__(self, capacity, batch_size, interval):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._condition = threading.Condition()
+        # Serializes flushes from the flusher thread, backpressure and exit
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.counters = dict.fromkeys(
+            ('accepted', 'written', 'batches', 'dropped', 'backpressure', 'failed_flushes'), 0,
+        )
+
+    def stats(self):
+        with self._condition:
+            return dict(self.counters, pending=len(self._pending), capacity=self.capacity)
+
+    def add(self, fields):
+        """Queue one visit's field values; False if it had to be dropped."""
+        self._ensure_thread()
+        with self._condition:
+            if len(self._pending) < self.capacity:
+                return self._append(fields)
+            self.counters['backpressure'] += 1
+        self.flush()
+        with self._condition:
+            if len(self._pending) < self.capacity:
+                return self._append(fields)
+            self.counters['dropped'] += 1
+        return False
+
+    def clear(self):
+        """Forget the visits not written yet."""
+        with self._condition:
+            self._pending = []
+
+    def _append(self, fields):
+        self._pending.append(fields)
+        self.counters['accepted'] += 1
+        if len(self._pending) >= self.batch_size:
+            self._condition.notify()
+        return True
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of visits written."""
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                close_old_connections()
+                with transaction.atomic():
+                    # SQLite won't let a reset commit between this read and the
+                    # insert; if it gets in first the insert fails and the retry
+                    # filters against the new cutoff
+                    cutoff = VisitReset.cutoff()
+                    kept = [fields for fields in batch if cutoff is None or fields['timestamp'] > cutoff]
+                    PageVisit.objects.bulk_create(
+                        [PageVisit(**fields) for fields in kept], batch_size=self.batch_size,
+                    )
+            except Exception:
+                logger.exception('Could not write %d buffered page visits', len(batch))
+                with self._condition:
+                    self.counters['failed_flushes'] += 1
+                    # Put them back in front of newer visits, as far as they fit
+                    room = max(self.capacity - len(self._pending), 0)
+                    self.counters['dropped'] += max(len(batch) - room, 0)
+                    self._pending[:0] = batch[:room]
+                return 0
+            with self._condition:
+                self.counters['written'] += len(kept)
+                self.counters['batches'] += 1
+            rollups.catch_up()
+            return len(kept)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size:
+                    self._condition.wait(self.interval)
+            self.flush()
+
+    def _ensure_thread(self):
+        # Started lazily so each forked worker gets its own flusher
+        if self._pid == os.getpid():
+            return
+        with self._condition:
+            if self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='visit-buffer', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+
+visit_buffer = VisitBuffer(
+    settings.ANALYTICS_BUFFER_SIZE, settings.ANALYTICS_BATCH_SIZE, settings.ANALYTICS_FLUSH_INTERVAL,
+)
+atexit.register(visit_buffer.flush)
+
+
+def record_visit(**fields):
+    """Store a page visit the way ``ANALYTICS_INGEST`` says; False if it was dropped."""
+    if settings.ANALYTICS_INGEST == 'segments':
+        return segment_log.append(fields)
+    if settings.ANALYTICS_INGEST == 'buffer':
+        return visit_buffer.add(fields)
+    PageVisit.objects.create(**fields)
+    return True
+
+
+def ingestion_stats():
+    """Counters of this worker's visit sink."""
+    if settings.ANALYTICS_INGEST == 'segments':
+        return dict(segment_log.stats(), mode='segments')
+    return dict(visit_buffer.stats(), mode=settings.ANALYTICS_INGEST)
@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from analytics.segments import compact_segments
+
+
+class Command(BaseCommand):
+    help = 'Load the page-visit segment log into PageVisit (safe to interrupt and re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+        parser.add_argument('--chunk-mb', type=int, default=4, help='Segment bytes parsed per task')
+        parser.add_argument(
+            '--every', type=float, default=0,
+            help='Keep running and compact every this many seconds instead of once',
+        )
+
+    def compact(self, options):
+        start = time.perf_counter()
+        loaded, bad, removed = compact_segments(options['workers'], options['chunk_mb'] * 1024 * 1024)
+        if loaded or bad or removed or not options['every']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Loaded {loaded} visits in {time.perf_counter() - start:.2f}s, '
+                f'skipped {bad} bad lines, removed {removed} segments'
+            ))
+
+    def handle(self, *args, **options):
+        self.compact(options)
+        while options['every']:
+            time.sleep(options['every'])
+            self.compact(options)
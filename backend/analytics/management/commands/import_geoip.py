@@ -0,0 +1,118 @@
+import csv
+import ipaddress
+import random
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from analytics.countries import country_name
+from analytics.geoip import GeoIPDatabase, parse_address, write_database
+
+try:
+    import maxminddb
+except ImportError:  # only needed for --format mmdb
+    maxminddb = None
+
+# Range CSVs without a header: (first, last, country code, country name, city) columns.
+# Countries are stored under analytics.countries names whatever the source calls them.
+RANGE_FORMATS = {
+    # IP2Location LITE DB3/DB5/DB11: integer bounds, ISO country code and name, city name
+    'ip2location': (0, 1, 2, 3, 5),
+    # DB-IP Lite city: address bounds, ISO country code, city name
+    'dbip': (0, 1, 3, None, 5),
+}
+
+# IP2Location's placeholder for reserved ranges
+UNKNOWN = '-'
+
+
+class Command(BaseCommand):
+    help = 'Build the offline GeoIP range table used by track_visit from a CSV or MMDB dump'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='IP2Location/DB-IP range CSV, GeoLite2 City blocks CSV or .mmdb file')
+        parser.add_argument(
+            '--format', choices=['ip2location', 'dbip', 'geolite2', 'mmdb'], default='ip2location',
+            help='Layout of the source (default: ip2location)',
+        )
+        parser.add_argument(
+            '--locations', action='append', default=[],
+            help='geolite2 only: City-Locations CSV mapping geoname ids to names (repeat for more files)',
+        )
+        parser.add_argument('--language', default='en', help='mmdb only: language of the place names')
+        parser.add_argument('--output', default=settings.GEOIP_DATABASE, help='Table to write (default: GEOIP_DATABASE)')
+
+    def range_csv(self, path, columns):
+        first, last, code, name, city = columns
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                try:
+                    start, end = parse_address(row[first]), parse_address(row[last])
+                    country = country_name(row[code], row[name] if name is not None else '')
+                    place = row[city]
+                except (IndexError, ValueError):
+                    continue  # header or malformed line
+                yield start, end, '' if country == UNKNOWN else country, '' if place == UNKNOWN else place
+
+    def geolite2_csv(self, path, location_paths):
+        if not location_paths:
+            raise CommandError('--format geolite2 needs the City-Locations CSV via --locations')
+        places = {}
+        for location_path in location_paths:
+            with open(location_path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    places[row['geoname_id']] = (
+                        country_name(row['country_iso_code'], row['country_name']), row['city_name'],
+                    )
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                place = places.get(row['geoname_id']) or places.get(row['registered_country_geoname_id'])
+                if place is None:
+                    continue
+                network = ipaddress.ip_network(row['network'])
+                yield network.network_address, network.broadcast_address, place[0], place[1]
+
+    def mmdb(self, path, language):
+        if maxminddb is None:
+            raise CommandError('Reading .mmdb files needs the maxminddb package (pip install maxminddb)')
+
+        def name(record, key):
+            return ((record or {}).get(key) or {}).get('names', {}).get(language, '')
+
+        def country_of(record):
+            place = (record or {}).get('country') or (record or {}).get('registered_country') or {}
+            local_name = place.get('names', {}).get(language, '')
+            # The shared names are English; other languages keep the dump's own
+            return country_name(place.get('iso_code'), local_name) if language == 'en' else local_name
+
+        with maxminddb.open_database(path) as reader:
+            for network, record in reader:
+                country = country_of(record)
+                if country:
+                    yield network.network_address, network.broadcast_address, country, name(record, 'city')
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        if fmt == 'geolite2':
+            ranges = self.geolite2_csv(options['source'], options['locations'])
+        elif fmt == 'mmdb':
+            ranges = self.mmdb(options['source'], options['language'])
+        else:
+            ranges = self.range_csv(options['source'], RANGE_FORMATS[fmt])
+
+        try:
+            v4, v6, locations, dropped = write_database(options['output'], ranges)
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        database = GeoIPDatabase(options['output'])
+        samples = [str(ipaddress.IPv4Address(random.getrandbits(32))) for _ in range(10000)]
+        start = time.perf_counter()
+        for ip in samples:
+            database.lookup(ip)
+        per_lookup = (time.perf_counter() - start) / len(samples) * 1_000_000
+        database.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {options["output"]}: {v4} IPv4 and {v6} IPv6 ranges, {locations} locations '
+            f'({dropped} overlapping ranges dropped); {per_lookup:.1f} µs per lookup'
+        ))
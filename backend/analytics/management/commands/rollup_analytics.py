@@ -0,0 +1,15 @@
+import time
+from django.core.management.base import BaseCommand
+from analytics import rollups
+
+
+class Command(BaseCommand):
+    help = 'Add page visits not counted yet to the analytics rollup tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recount every rollup from all page visits')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        added = rollups.rebuild() if options['rebuild'] else rollups.roll_up()
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {added} visits in {time.perf_counter() - start:.2f}s'))
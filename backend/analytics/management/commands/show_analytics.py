@@ -1,9 +1,7 @@
 from django.core.management.base import BaseCommand
-from django.db.models import Count
-from django.db.models.functions import TruncDate, TruncMonth, TruncYear
 from django.utils import timezone
 from datetime import timedelta
-from analytics.models import PageVisit
+from analytics import rollups
 
 class Command(BaseCommand):
     help = 'Display website analytics statistics'
@@ -22,31 +20,18 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS(f'\n=== Website Analytics ({period.upper()}) ===\n'))
         
-        total = PageVisit.objects.count()
+        rollups.catch_up()
+        total = rollups.rollup('total').values_list('count', flat=True).first() or 0
         self.stdout.write(f'Total Visits: {total}\n')
         
         if period == 'daily':
-            stats = PageVisit.objects.filter(
-                timestamp__gte=timezone.now() - timedelta(days=30)
-            ).annotate(
-                date=TruncDate('timestamp')
-            ).values('date').annotate(count=Count('id')).order_by('-date')
-            
-            for stat in stats:
-                self.stdout.write(f"{stat['date']}: {stat['count']} visits")
+            for day, count in rollups.series('day', (timezone.now() - timedelta(days=30)).date()):
+                self.stdout.write(f"{day}: {count} visits")
         
         elif period == 'monthly':
-            stats = PageVisit.objects.annotate(
-                month=TruncMonth('timestamp')
-            ).values('month').annotate(count=Count('id')).order_by('-month')[:12]
-            
-            for stat in stats:
-                self.stdout.write(f"{stat['month'].strftime('%B %Y')}: {stat['count']} visits")
+            for month, count in rollups.series('month')[:12]:
+                self.stdout.write(f"{month.strftime('%B %Y')}: {count} visits")
         
         elif period == 'yearly':
-            stats = PageVisit.objects.annotate(
-                year=TruncYear('timestamp')
-            ).values('year').annotate(count=Count('id')).order_by('-year')
-            
-            for stat in stats:
-                self.stdout.write(f"{stat['year'].year}: {stat['count']} visits")
+            for year, count in rollups.series('year'):
+                self.stdout.write(f"{year.year}: {count} visits")
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_pagevisit_traffic_source_pagevisit_utm_campaign_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitSegmentCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
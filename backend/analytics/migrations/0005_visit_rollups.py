@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_visit_segment_checkpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitRollupMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_visit_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VisitRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('month', 'Month'), ('year', 'Year'), ('all', 'All time')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.CharField(blank=True, max_length=500)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'dimension', 'bucket'], name='analytics_v_period_cfab90_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'dimension', 'value'), name='unique_visit_rollup'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_visit_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitReset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reset_at', models.DateTimeField()),
+            ],
+        ),
+    ]
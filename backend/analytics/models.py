@@ -24,3 +24,62 @@ class PageVisit(models.Model):
     
     def __str__(self):
         return f"{self.ip_address} - {self.path} - {self.timestamp}"
+
+
+class VisitSegmentCheckpoint(models.Model):
+    """How far ``compact_visit_segments`` has loaded a segment file into PageVisit."""
+    name = models.CharField(max_length=100, primary_key=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.offset}"
+
+
+class VisitRollup(models.Model):
+    """Visit count per time bucket and dimension value, maintained by ``analytics.rollups``."""
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('month', 'Month'),
+        ('year', 'Year'),
+        ('all', 'All time'),
+    ]
+
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    # First day of the bucket; 1970-01-01 for 'all'
+    bucket = models.DateField()
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=500, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'bucket', 'dimension', 'value'], name='unique_visit_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'dimension', 'bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.bucket} {self.dimension}={self.value}: {self.count}"
+
+
+class VisitRollupMark(models.Model):
+    """High-water mark: the last PageVisit id included in the rollups."""
+    last_visit_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Rollups up to visit {self.last_visit_id}"
+
+
+class VisitReset(models.Model):
+    """When the analytics were last reset; visits stamped before it are discarded on the way in."""
+    reset_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Analytics reset at {self.reset_at}"
+
+    @classmethod
+    def cutoff(cls):
+        return cls.objects.filter(pk=1).values_list('reset_at', flat=True).first()
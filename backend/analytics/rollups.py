@@ -0,0 +1,182 @@
+"""Visit counts pre-aggregated per time bucket and dimension.
+
+``VisitRollup`` keeps one count per (period, bucket, dimension, value), with
+period one of day/month/year/all and dimension one of ``DIMENSIONS``.
+``roll_up`` folds the visits added since the high-water mark
+(``VisitRollupMark``) into it. It runs after every ingest batch and before
+the dashboard reads, so ``analytics_stats`` and ``show_analytics`` cost the
+same however much history there is.
+
+The mark is the id of the last visit counted, so it relies on ids not being
+handed out twice. Django creates the SQLite table with AUTOINCREMENT, which
+guarantees that. For databases that reuse the ids of deleted rows, a mark past
+the newest visit is lowered back to it. Deleting visits doesn't reduce the
+rollups; ``manage.py rollup_analytics --rebuild`` recounts them.
+"""
+import base64
+import logging
+from collections import Counter
+from datetime import date, datetime, time
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from .models import PageVisit, VisitRollup, VisitRollupMark
+
+logger = logging.getLogger(__name__)
+
+ALL_BUCKET = date(1970, 1, 1)
+# PageVisit fields counted per value; 'total' counts every visit under ''
+FIELDS = ('ip_address', 'path', 'device_type', 'browser', 'country', 'referrer', 'traffic_source', 'utm_campaign')
+DIMENSIONS = ('total',) + FIELDS
+
+
+def buckets(timestamp):
+    day = timezone.localtime(timestamp).date()
+    return (('day', day), ('month', day.replace(day=1)), ('year', day.replace(month=1, day=1)), ('all', ALL_BUCKET))
+
+
+def bucket_start(bucket):
+    """The bucket as the aware datetime TruncMonth/TruncYear would return."""
+    return timezone.make_aware(datetime.combine(bucket, time.min))
+
+
+def _upsert(counts):
+    qn = connection.ops.quote_name
+    table = qn(VisitRollup._meta.db_table)
+    count = qn('count')
+    sql = (
+        f'INSERT INTO {table} ({qn("period")}, {qn("bucket")}, {qn("dimension")}, {qn("value")}, {count}) '
+        f'VALUES (%s, %s, %s, %s, %s) '
+        f'ON CONFLICT ({qn("period")}, {qn("bucket")}, {qn("dimension")}, {qn("value")}) '
+        f'DO UPDATE SET {count} = {table}.{count} + excluded.{count}'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (period, bucket.isoformat(), dimension, value, n)
+            for (period, bucket, dimension, value), n in counts.items()
+        ])
+
+
+def roll_up(batch_size=10000):
+    """Add the visits past the high-water mark to the rollups; returns how many were added."""
+    # Ids only ever grow in commit order because SQLite serializes writers,
+    # so nothing below the mark can show up later
+    added = 0
+    while True:
+        with transaction.atomic():
+            # Writing first takes SQLite's write lock up front; two runs that
+            # read first and then write deadlock and fail with "database is locked"
+            if not VisitRollupMark.objects.filter(pk=1).update(updated_at=timezone.now()):
+                VisitRollupMark.objects.get_or_create(pk=1)
+            mark = VisitRollupMark.objects.get(pk=1)
+            newest = PageVisit.objects.aggregate(newest=Max('id'))['newest'] or 0
+            if newest < mark.last_visit_id:
+                # The newest visits were deleted and their ids may come back
+                VisitRollupMark.objects.filter(pk=1, last_visit_id=mark.last_visit_id).update(last_visit_id=newest)
+                mark.last_visit_id = newest
+            rows = list(
+                PageVisit.objects.filter(id__gt=mark.last_visit_id).order_by('id')
+                .values_list('id', 'timestamp', *FIELDS)[:batch_size]
+            )
+            if not rows:
+                return added
+            # Claim the rows first: a concurrent run that read the same mark updates nothing and stops
+            claimed = VisitRollupMark.objects.filter(pk=1, last_visit_id=mark.last_visit_id).update(
+                last_visit_id=rows[-1][0], updated_at=timezone.now(),
+            )
+            if not claimed:
+                return added
+            counts = Counter()
+            for visit_id, timestamp, *values in rows:
+                for period, bucket in buckets(timestamp):
+                    counts[(period, bucket, 'total', '')] += 1
+                    for dimension, value in zip(FIELDS, values):
+                        counts[(period, bucket, dimension, value or '')] += 1
+            _upsert(counts)
+        added += len(rows)
+
+
+def catch_up():
+    """``roll_up`` for callers that must not fail because of it (ingest, the dashboard)."""
+    try:
+        return roll_up()
+    except DatabaseError:
+        logger.exception('Could not update the visit rollups')
+        return 0
+
+
+def rebuild():
+    """Recount every rollup from PageVisit."""
+    with transaction.atomic():
+        VisitRollup.objects.all().delete()
+        VisitRollupMark.objects.update_or_create(pk=1, defaults={'last_visit_id': 0})
+    return roll_up()
+
+
+def reset():
+    """Forget all rollups, e.g. together with the visits themselves."""
+    VisitRollup.objects.all().delete()
+    VisitRollupMark.objects.filter(pk=1).update(last_visit_id=0)
+
+
+def rollup(dimension, period='all', bucket=ALL_BUCKET):
+    """Rollup rows of one bucket, biggest count first."""
+    return VisitRollup.objects.filter(
+        period=period, bucket=bucket, dimension=dimension,
+    ).order_by('-count', 'value')
+
+
+def series(period, since=None):
+    """``(bucket, visits)`` for every bucket of ``period`` from ``since``, newest first."""
+    rows = VisitRollup.objects.filter(period=period, dimension='total', value='')
+    if since is not None:
+        rows = rows.filter(bucket__gte=since)
+    return list(rows.order_by('-bucket').values_list('bucket', 'count'))
+
+
+def top_values(dimension, period, since=None, limit=10):
+    """The ``limit`` biggest values of every bucket of ``period`` from ``since``, in one query.
+
+    Returns ``{bucket: (rows, distinct)}``: ``(value, count)`` rows biggest
+    first, and how many values the bucket has in all.
+    """
+    rows = VisitRollup.objects.filter(period=period, dimension=dimension)
+    if since is not None:
+        rows = rows.filter(bucket__gte=since)
+    rows = rows.annotate(
+        rank=Window(RowNumber(), partition_by=F('bucket'), order_by=(F('count').desc(), F('value').asc())),
+        distinct=Window(Count('*'), partition_by=F('bucket')),
+    ).filter(rank__lte=limit).order_by('bucket', 'rank')
+    top = {}
+    for bucket, value, count, distinct in rows.values_list('bucket', 'value', 'count', 'distinct'):
+        top.setdefault(bucket, ([], distinct))[0].append((value, count))
+    return top
+
+
+def encode_cursor(row):
+    count, value = row
+    return base64.urlsafe_b64encode(f'{count}|{value}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (count, value) from a cursor, raising ValueError if malformed."""
+    try:
+        count, value = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return int(count), value
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def value_page(dimension, period, bucket, cursor, page_size):
+    """Page of a bucket's ``(value, count)`` rows after ``cursor``, keyed on (count, value).
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    rows = rollup(dimension, period, bucket)
+    if cursor:
+        count, value = decode_cursor(cursor)
+        rows = rows.filter(Q(count__lt=count) | Q(count=count, value__gt=value))
+    rows = list(rows.values_list('count', 'value')[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return [(value, count) for count, value in rows[:page_size]], next_cursor
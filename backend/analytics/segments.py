@@ -0,0 +1,299 @@
+"""Append-only NDJSON segment log for page visits, compacted into PageVisit later.
+
+With ``ANALYTICS_INGEST = 'segments'`` each worker appends one JSON line per
+visit to its own segment in ``ANALYTICS_SEGMENT_DIR``, so ingestion costs a
+sequential ``write()`` and never waits on the SQLite write lock. A background
+thread fsyncs the segment once per ``ANALYTICS_SEGMENT_FSYNC_INTERVAL`` rather
+than per record. Segments being written end in ``.ndjson.open``. They are
+sealed (renamed to ``.ndjson``) once they reach
+``ANALYTICS_SEGMENT_MAX_BYTES`` or ``ANALYTICS_SEGMENT_MAX_AGE`` seconds.
+
+``compact_segments`` (``manage.py compact_visit_segments``) parses segments
+in parallel and loads them in order. The segment's byte offset is
+checkpointed in the same transaction as the rows, so interrupted or repeated
+runs never load a line twice. The offset only moves on from where the span
+was read, so overlapping runs don't either. Open segments are read up to
+their last complete line. Sealed segments are deleted once fully loaded.
+Visits stamped before the last analytics reset (``VisitReset``) are skipped.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from . import rollups
+from .models import PageVisit, VisitReset, VisitSegmentCheckpoint
+
+logger = logging.getLogger(__name__)
+
+OPEN_SUFFIX = '.ndjson.open'
+SEALED_SUFFIX = '.ndjson'
+
+
+def sealed_path(path):
+    return path.with_name(path.name[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX)
+
+
+def open_segment(path):
+    """Open a segment for reading, following it if its writer sealed it since it was listed."""
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        if not path.name.endswith(OPEN_SUFFIX):
+            raise
+        return open(sealed_path(path), 'rb')
+
+
+class SegmentLog:
+    def __init__(self, directory, max_bytes, max_age, fsync_interval):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._fd = None
+        self._path = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._dirty = False
+        self._pid = None
+        self._syncer_pid = None
+        self.counters = dict.fromkeys(('appended', 'segments', 'fsyncs', 'failed'), 0)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, segment=self._path.name if self._path else None, segment_bytes=self._size)
+
+    def append(self, fields):
+        """Append one visit's field values; False if the write failed."""
+        record = dict(fields, timestamp=fields['timestamp'].isoformat())
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        self._ensure_syncer()
+        with self._lock:
+            try:
+                if self._fd is None or self._pid != os.getpid() or self._size >= self.max_bytes:
+                    self._rotate()
+                os.write(self._fd, line)
+            except OSError:
+                logger.exception('Could not append a page visit to %s', self._path)
+                self.counters['failed'] += 1
+                return False
+            self._size += len(line)
+            self._dirty = True
+            self.counters['appended'] += 1
+        return True
+
+    def _seal(self):
+        if self._fd is None:
+            return
+        if self._dirty:
+            os.fsync(self._fd)
+            self.counters['fsyncs'] += 1
+        os.close(self._fd)
+        os.replace(self._path, sealed_path(self._path))
+        self._fd = self._path = None
+        self._size = 0
+        self._dirty = False
+
+    def _rotate(self):
+        if self._pid == os.getpid():
+            self._seal()
+        else:
+            # A segment inherited over fork belongs to the parent
+            self._fd = self._path = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pid = os.getpid()
+        self._path = self.directory / f'{time.time_ns()}-{self._pid}{OPEN_SUFFIX}'
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = 0
+        self._opened_at = time.monotonic()
+        self.counters['segments'] += 1
+
+    def sync(self):
+        """fsync what was appended since the last call and seal the segment if it is old enough."""
+        with self._lock:
+            if self._fd is None or self._pid != os.getpid():
+                return
+            try:
+                if self._size and time.monotonic() - self._opened_at >= self.max_age:
+                    self._seal()
+                elif self._dirty:
+                    os.fsync(self._fd)
+                    self._dirty = False
+                    self.counters['fsyncs'] += 1
+            except OSError:
+                logger.exception('Could not sync %s', self._path)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                self._seal()
+
+    def _run_syncer(self):
+        while True:
+            time.sleep(self.fsync_interval)
+            self.sync()
+
+    def _ensure_syncer(self):
+        if self._syncer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._syncer_pid != os.getpid():
+                threading.Thread(target=self._run_syncer, name='visit-segments', daemon=True).start()
+                self._syncer_pid = os.getpid()
+
+
+segment_log = SegmentLog(
+    settings.ANALYTICS_SEGMENT_DIR, settings.ANALYTICS_SEGMENT_MAX_BYTES,
+    settings.ANALYTICS_SEGMENT_MAX_AGE, settings.ANALYTICS_SEGMENT_FSYNC_INTERVAL,
+)
+atexit.register(segment_log.close)
+
+
+def parse_chunk(path, start, end):
+    """Visit field dicts from bytes ``start:end`` of a segment plus the number of bad lines."""
+    with open_segment(path) as f:
+        f.seek(start)
+        data = f.read(end - start)
+    rows, bad = [], 0
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+        except (ValueError, KeyError, TypeError):
+            bad += 1
+            continue
+        rows.append(record)
+    return rows, bad
+
+
+def segment_name(path):
+    return path.name.split('.')[0]
+
+
+def _spans(path, offset, chunk_bytes, sealed):
+    """``(start, end)`` byte ranges from ``offset`` that end on line boundaries.
+
+    An open segment is only read up to its last complete line; a sealed one to
+    its end, so a line cut short by a crash is counted as bad and skipped.
+    """
+    with open_segment(path) as f:
+        size = os.fstat(f.fileno()).st_size
+        while offset < size:
+            f.seek(offset)
+            data = f.read(chunk_bytes)
+            end = offset + data.rfind(b'\n') + 1
+            if end == offset:
+                # No newline in a whole chunk: take the line however long it is
+                rest = f.readline()
+                end = offset + len(data) + len(rest)
+                if not rest.endswith(b'\n') and not sealed:
+                    break
+            yield offset, end
+            offset = end
+        if sealed and offset < size:
+            yield offset, size
+
+
+def _tasks(directory, chunk_bytes):
+    now = time.time()
+    for path in directory.glob(f'*{OPEN_SUFFIX}'):
+        try:
+            # The worker writing it died or stopped rotating it
+            if now - path.stat().st_mtime > max(settings.ANALYTICS_SEGMENT_MAX_AGE * 2, 60):
+                os.replace(path, sealed_path(path))
+        except FileNotFoundError:
+            pass  # sealed meanwhile
+
+    segments = sorted(directory.glob(f'*{SEALED_SUFFIX}')) + sorted(directory.glob(f'*{OPEN_SUFFIX}'))
+    names = [segment_name(path) for path in segments]
+    # Checkpoints outlive their segment only if a run stopped right after deleting it
+    VisitSegmentCheckpoint.objects.exclude(name__in=names).delete()
+    # Every segment gets its row up front so loads can compare-and-swap its offset
+    VisitSegmentCheckpoint.objects.bulk_create(
+        [VisitSegmentCheckpoint(name=name) for name in names], ignore_conflicts=True,
+    )
+    checkpoints = VisitSegmentCheckpoint.objects.in_bulk(names)
+    for path, name in zip(segments, names):
+        checkpoint = checkpoints.get(name)
+        if checkpoint is None:
+            continue  # fully loaded and removed by a compactor running alongside
+        sealed = path.name.endswith(SEALED_SUFFIX)
+        try:
+            for start, end in _spans(path, checkpoint.offset, chunk_bytes, sealed):
+                yield path, name, start, end
+        except FileNotFoundError:
+            continue  # removed by a compactor running alongside
+        if sealed:
+            yield path, name, None, None  # fully loaded once its spans are
+
+
+def compact_segments(workers=None, chunk_bytes=4 * 1024 * 1024, batch_size=1000):
+    """Load every segment into PageVisit; returns ``(visits loaded, bad lines, segments removed)``."""
+    directory = Path(settings.ANALYTICS_SEGMENT_DIR)
+    if not directory.is_dir():
+        return 0, 0, 0
+    workers = workers or os.cpu_count() or 1
+    loaded = bad = removed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A bounded number of chunks is parsed ahead of the one being loaded
+        ahead = deque()
+        tasks = _tasks(directory, chunk_bytes)
+        limit = workers * 2
+        while True:
+            while len(ahead) < limit:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                path, name, start, end = task
+                future = executor.submit(parse_chunk, path, start, end) if start is not None else None
+                ahead.append((task, future))
+            if not ahead:
+                break
+            (path, name, start, end), future = ahead.popleft()
+            if future is None:
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    continue  # removed by a compactor running alongside
+                # That compactor may also still be loading it
+                if VisitSegmentCheckpoint.objects.filter(name=name, offset__gte=size).exists():
+                    # The file goes first, so no run can start over on it from a new checkpoint
+                    path.unlink(missing_ok=True)
+                    deleted, _ = VisitSegmentCheckpoint.objects.filter(name=name).delete()
+                    removed += deleted
+                continue
+            try:
+                rows, bad_lines = future.result()
+            except FileNotFoundError:
+                # Removed by a compactor running alongside; the offset stays,
+                # so the segment's later spans can't be claimed either
+                continue
+            # Rows and the checkpoint move together, and only from the offset
+            # the span was read at: a compactor running alongside that loaded
+            # the span first leaves nothing to claim, so no line is loaded twice
+            with transaction.atomic():
+                claimed = VisitSegmentCheckpoint.objects.filter(name=name, offset=start).update(
+                    offset=end, updated_at=timezone.now(),
+                )
+                if not claimed:
+                    continue
+                # Read after the claim took the write lock, so no reset can slip in
+                cutoff = VisitReset.cutoff()
+                rows = [row for row in rows if cutoff is None or row['timestamp'] > cutoff]
+                PageVisit.objects.bulk_create([PageVisit(**row) for row in rows], batch_size=batch_size)
+            loaded += len(rows)
+            bad += bad_lines
+    if loaded:
+        rollups.catch_up()
+    return loaded, bad, removed
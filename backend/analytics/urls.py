@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('stats/', views.analytics_stats, name='analytics-stats'),
+    path('stats/ips/', views.analytics_ips, name='analytics-ips'),
     path('track/', views.track_visit, name='track-visit'),
     path('reset/', views.reset_analytics, name='reset-analytics'),
 ]
@@ -1,23 +1,28 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Count
-from django.db.models.functions import TruncDate, TruncMonth, TruncYear
+from django.db import transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
-from .models import PageVisit
-import requests
+from .models import PageVisit, VisitReset
+from . import geoip, rollups
+from .ingest import ingestion_stats, record_visit, visit_buffer
 from urllib.parse import urlparse, parse_qs
 
+IP_BREAKDOWN_LIMIT = 10
+MAX_IP_BREAKDOWN_LIMIT = 100
+IP_PAGE_SIZE = 50
+MAX_IP_PAGE_SIZE = 500
+
+def is_valid_ip(ip):
+    return geoip.pack_address(ip) is not None
+
 def get_location_from_ip(ip):
     if ip == '127.0.0.1':
         return 'Local', 'Local'
-    try:
-        res = requests.get(f'http://ip-api.com/json/{ip}', timeout=2)
-        data = res.json()
-        return data.get('country', ''), data.get('city', '')
-    except:
-        return '', ''
+    # Offline range table, see import_geoip
+    return geoip.lookup(ip)
 
 def parse_user_agent(ua):
     ua_lower = ua.lower()
@@ -84,111 +89,120 @@ def categorize_traffic_source(referrer, utm_source):
 @permission_classes([IsAuthenticated])
 def analytics_stats(request):
     period = request.GET.get('period', 'daily')
-    
+
+    # Counts come from the rollup tables, see analytics.rollups
     if period == 'daily':
-        base_stats = PageVisit.objects.filter(
-            timestamp__gte=timezone.now() - timedelta(days=30)
-        ).annotate(
-            date=TruncDate('timestamp')
-        ).values('date').annotate(
-            count=Count('id')
-        ).order_by('-date')
-        
-        # Get IP addresses for each date
-        stats = []
-        for stat in base_stats:
-            ip_data = PageVisit.objects.filter(
-                timestamp__date=stat['date']
-            ).values('ip_address').annotate(visit_count=Count('id')).order_by('-visit_count')
-            stats.append({
-                'date': stat['date'],
-                'count': stat['count'],
-                'ip_data': list(ip_data)
-            })
-    
+        key, stats_period, since = 'date', 'day', (timezone.now() - timedelta(days=30)).date()
     elif period == 'monthly':
-        base_stats = PageVisit.objects.filter(
-            timestamp__gte=timezone.now() - timedelta(days=365)
-        ).annotate(
-            month=TruncMonth('timestamp')
-        ).values('month').annotate(
-            count=Count('id')
-        ).order_by('-month')
-        
-        stats = []
-        for stat in base_stats:
-            ip_data = PageVisit.objects.filter(
-                timestamp__year=stat['month'].year,
-                timestamp__month=stat['month'].month
-            ).values('ip_address').annotate(visit_count=Count('id')).order_by('-visit_count')
-            stats.append({
-                'month': stat['month'],
-                'count': stat['count'],
-                'ip_data': list(ip_data)
-            })
-    
+        key, stats_period, since = 'month', 'month', (timezone.now() - timedelta(days=365)).date().replace(day=1)
     elif period == 'yearly':
-        base_stats = PageVisit.objects.annotate(
-            year=TruncYear('timestamp')
-        ).values('year').annotate(
-            count=Count('id')
-        ).order_by('-year')
-        
-        stats = []
-        for stat in base_stats:
-            ip_data = PageVisit.objects.filter(
-                timestamp__year=stat['year'].year
-            ).values('ip_address').annotate(visit_count=Count('id')).order_by('-visit_count')
-            stats.append({
-                'year': stat['year'],
-                'count': stat['count'],
-                'ip_data': list(ip_data)
-            })
-    
+        key, stats_period, since = 'year', 'year', None
     else:
         return Response({'error': 'Invalid period'}, status=400)
-    
-    unique_visitors = PageVisit.objects.values('ip_address').distinct().count()
-    top_pages = PageVisit.objects.exclude(path__startswith='/login').exclude(path__startswith='/admin').values('path').annotate(count=Count('id')).order_by('-count')[:10]
-    device_stats = PageVisit.objects.values('device_type').annotate(count=Count('id')).order_by('-count')
-    browser_stats = PageVisit.objects.values('browser').annotate(count=Count('id')).order_by('-count')
-    country_stats = PageVisit.objects.exclude(country='').values('country').annotate(count=Count('id')).order_by('-count')[:10]
-    referrer_stats = PageVisit.objects.exclude(referrer='').exclude(referrer__contains='localhost').exclude(referrer__contains='127.0.0.1').values('referrer').annotate(count=Count('id')).order_by('-count')[:10]
-    traffic_source_stats = PageVisit.objects.values('traffic_source').annotate(count=Count('id')).order_by('-count')
-    social_media_stats = PageVisit.objects.filter(
-        traffic_source__in=['Facebook', 'Instagram', 'Twitter', 'LinkedIn', 'TikTok', 'YouTube']
-    ).values('traffic_source').annotate(count=Count('id')).order_by('-count')
-    
+
+    try:
+        ip_limit = max(1, min(int(request.GET.get('ip_limit', IP_BREAKDOWN_LIMIT)), MAX_IP_BREAKDOWN_LIMIT))
+    except ValueError:
+        return Response({'error': 'Invalid ip_limit'}, status=400)
+
+    rollups.catch_up()
+    # Top IPs of every bucket in one query; the full list is paged by analytics_ips
+    top_ips = rollups.top_values('ip_address', stats_period, since, ip_limit)
+    stats = []
+    for bucket, count in rollups.series(stats_period, since):
+        ips, ip_count = top_ips.get(bucket, ([], 0))
+        stats.append({
+            key: bucket if stats_period == 'day' else rollups.bucket_start(bucket),
+            'count': count,
+            'ip_data': [{'ip_address': ip, 'visit_count': visits} for ip, visits in ips],
+            'ip_count': ip_count,
+            'ip_others': count - sum(visits for ip, visits in ips),
+        })
+
+    def counts(field, rows=None):
+        rows = rollups.rollup(field) if rows is None else rows
+        return [{field: value, 'count': count} for value, count in rows.values_list('value', 'count')]
+
+    total = rollups.rollup('total').values_list('count', flat=True).first() or 0
+    unique_visitors = rollups.rollup('ip_address').count()
+    top_pages = counts('path', rollups.rollup('path').exclude(value__startswith='/login').exclude(value__startswith='/admin')[:10])
+    device_stats = counts('device_type')
+    browser_stats = counts('browser')
+    country_stats = counts('country', rollups.rollup('country').exclude(value='')[:10])
+    referrer_stats = counts('referrer', rollups.rollup('referrer').exclude(value='').exclude(value__contains='localhost').exclude(value__contains='127.0.0.1')[:10])
+    traffic_source_stats = counts('traffic_source')
+    social_media_stats = counts('traffic_source', rollups.rollup('traffic_source').filter(
+        value__in=['Facebook', 'Instagram', 'Twitter', 'LinkedIn', 'TikTok', 'YouTube']
+    ))
+
     return Response({
         'period': period,
         'stats': stats,
-        'total': PageVisit.objects.count(),
+        'total': total,
         'unique_visitors': unique_visitors,
-        'top_pages': list(top_pages),
-        'device_stats': list(device_stats),
-        'browser_stats': list(browser_stats),
-        'country_stats': list(country_stats),
-        'referrer_stats': list(referrer_stats),
-        'traffic_source_stats': list(traffic_source_stats),
-        'social_media_stats': list(social_media_stats)
+        'top_pages': top_pages,
+        'device_stats': device_stats,
+        'browser_stats': browser_stats,
+        'country_stats': country_stats,
+        'referrer_stats': referrer_stats,
+        'traffic_source_stats': traffic_source_stats,
+        'social_media_stats': social_media_stats,
+        # Counters of the worker that answered, see analytics.ingest
+        'ingestion': ingestion_stats(),
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_ips(request):
+    """Every IP of one stats bucket with its visits, a page at a time."""
+    periods = {'daily': 'day', 'monthly': 'month', 'yearly': 'year'}
+    period = request.GET.get('period', 'daily')
+    if period not in periods:
+        return Response({'error': 'Invalid period'}, status=400)
+    try:
+        # Any date inside the bucket, e.g. the date/month/year of a stats row
+        day = parse_date(request.GET.get('bucket', '')[:10])
+    except ValueError:
+        day = None
+    if day is None:
+        return Response({'error': 'Invalid bucket'}, status=400)
+    bucket = {'day': day, 'month': day.replace(day=1), 'year': day.replace(month=1, day=1)}[periods[period]]
+    try:
+        page_size = max(1, min(int(request.GET.get('page_size', IP_PAGE_SIZE)), MAX_IP_PAGE_SIZE))
+        ips, next_cursor = rollups.value_page('ip_address', periods[period], bucket, request.GET.get('cursor'), page_size)
+    except ValueError:
+        return Response({'error': 'Invalid cursor or page_size'}, status=400)
+    return Response({
+        'results': [{'ip_address': ip, 'visit_count': visits} for ip, visits in ips],
+        'next_cursor': next_cursor,
     })
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def reset_analytics(request):
-    PageVisit.objects.all().delete()
+    visit_buffer.clear()
+    with transaction.atomic():
+        # Other workers' buffers and segment compaction drop visits from before this
+        VisitReset.objects.update_or_create(pk=1, defaults={'reset_at': timezone.now()})
+        PageVisit.objects.all().delete()
+        rollups.reset()
     return Response({'success': True, 'message': 'All analytics data cleared'})
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def track_visit(request):
-    ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR', '127.0.0.1')).split(',')[0]
+    ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR', '127.0.0.1')).split(',')[0].strip()
     user_agent = request.data.get('user_agent', '')
+    path = request.data.get('path', '/')
+    referrer = request.data.get('referrer', '')
+    if not all(isinstance(value, str) for value in (user_agent, path, referrer)):
+        return Response({'error': 'user_agent, path and referrer must be strings'}, status=400)
+    if not is_valid_ip(ip):
+        ip = request.META.get('REMOTE_ADDR', '127.0.0.1')
+
     device, browser = parse_user_agent(user_agent)
     country, city = get_location_from_ip(ip)
-    
-    path = request.data.get('path', '/')
-    referrer = request.data.get('referrer', '')[:500]
+    referrer = referrer[:500]
     
     # Parse UTM parameters from path
     utm_source = utm_medium = utm_campaign = ''
@@ -203,10 +217,12 @@ def track_visit(request):
     
     traffic_source = categorize_traffic_source(referrer, utm_source)
     
-    PageVisit.objects.create(
+    # Written in batches by the ingestion buffer, so stamp the visit now
+    recorded = record_visit(
+        timestamp=timezone.now(),
         ip_address=ip,
         user_agent=user_agent[:500],
-        path=path,
+        path=path[:500],
         device_type=device,
         browser=browser,
         country=country,
@@ -217,4 +233,6 @@ def track_visit(request):
         utm_medium=utm_medium,
         utm_campaign=utm_campaign
     )
+    if not recorded:
+        return Response({'success': False, 'dropped': True}, status=503)
     return Response({'success': True})
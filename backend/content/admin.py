@@ -13,7 +13,7 @@ class MaintenanceAdmin:
         return custom_urls + urls
     
     def maintenance_toggle_view(self, request):
-        settings, created = SiteSettings.objects.get_or_create(id=1)
+        settings = SiteSettings.get_for_update()
         settings.maintenance_mode = not settings.maintenance_mode
         settings.save()
         self.message_user(request, f'Maintenance mode {"enabled" if settings.maintenance_mode else "disabled"}')
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class ContentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'content'
\ No newline at end of file
+    name = 'content'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,36 @@
+from .cache import get_section
+
+# Sections every route renders through Header/Footer
+LAYOUT_SECTIONS = ('site_settings', 'menu_items', 'color_palette', 'services')
+
+BUNDLES = {
+    'home': LAYOUT_SECTIONS + (
+        'hero_sections', 'about_section', 'services_section', 'working_process',
+        'working_process_section', 'projects', 'why_choose_us', 'why_choose_us_section',
+        'client_logos', 'team_members', 'team_section', 'testimonials',
+        'testimonials_section', 'blog_posts', 'blogs_section', 'faqs',
+        'contact_info', 'contact_section',
+    ),
+    'about': LAYOUT_SECTIONS + (
+        'about_section', 'why_choose_us', 'why_choose_us_section', 'team_members',
+        'team_section', 'testimonials', 'testimonials_section', 'client_logos',
+    ),
+    'services': LAYOUT_SECTIONS + (
+        'services_section', 'working_process', 'working_process_section', 'faqs',
+    ),
+    'projects': LAYOUT_SECTIONS + ('projects',),
+    'blogs': LAYOUT_SECTIONS + ('blog_posts', 'blogs_section'),
+    'contact': LAYOUT_SECTIONS + ('contact_info', 'contact_section', 'faqs'),
+}
+
+
+def bundle_sections(name):
+    return BUNDLES.get(name, ())
+
+
+def get_bundle(name):
+    """Assemble a route bundle from the section cache.
+
+    Only sections invalidated since the last build hit the database again.
+    """
+    return {section: get_section(section) for section in BUNDLES[name]}
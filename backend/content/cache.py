@@ -0,0 +1,183 @@
+import hashlib
+import time
+from functools import wraps
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags, urlencode
+from .compression import ENCODINGS, choose_encoding, compress_variants, encoded_etag, vary_on_encoding
+from .sections import SECTIONS, build_section
+
+# Every cache entry for an endpoint embeds the endpoint's current generation.
+# Invalidating an endpoint just moves its generation forward, so entries built
+# from rows read before a write can never be served after it.
+GENERATION_KEY = 'content:generation:{}'
+
+# Query parameters the cached endpoints read. Requests carrying any other
+# parameter (tracking tags, cache-busters) skip the cache instead of each
+# filling a permanent entry of their own.
+CACHE_PARAMS = frozenset(('cursor', 'fields', 'icons', 'limit', 'omit', 'page_size', 'q', 'type'))
+
+# Global version of everything served publicly, in nanoseconds since the epoch.
+# Drives the ETag/Last-Modified headers of every cached endpoint.
+CONTENT_VERSION_KEY = 'content:version'
+
+
+def _new_generation():
+    return time.time_ns()
+
+
+def get_generations(names):
+    keys = {GENERATION_KEY.format(name): name for name in names}
+    found = cache.get_many(list(keys))
+    missing = {key: _new_generation() for key in keys if key not in found}
+    for key, value in missing.items():
+        cache.add(key, value, None)
+    if missing:
+        found.update(cache.get_many(list(missing)))
+    return {keys[key]: found.get(key, missing.get(key)) for key in keys}
+
+
+def invalidate(names, bump_version=True):
+    generation = _new_generation()
+    cache.set_many({GENERATION_KEY.format(name): generation for name in names}, None)
+    if bump_version:
+        bump_content_version()
+
+
+def get_content_version():
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        cache.add(CONTENT_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CONTENT_VERSION_KEY, time.time_ns())
+    return version
+
+
+def bump_content_version():
+    # Step at least a whole second so Last-Modified (second precision) changes too
+    previous_second = get_content_version() // 1_000_000_000
+    version = max(time.time_ns(), (previous_second + 1) * 1_000_000_000)
+    cache.set(CONTENT_VERSION_KEY, version, None)
+    return version
+
+
+def endpoints_for_model(model):
+    return [name for name, (builder, models) in SECTIONS.items() if model in models]
+
+
+def model_generation_name(model):
+    return f'model:{model._meta.label_lower}'
+
+
+def invalidate_model(model):
+    names = endpoints_for_model(model)
+    # Models no public endpoint reads from (form submissions) keep the version
+    invalidate([model_generation_name(model)] + names, bump_version=bool(names))
+    if names:
+        from .export import schedule_export
+        schedule_export()
+
+
+def get_section(name):
+    """Read-through cache for the payload of a public section."""
+    generation = get_generations([name])[name]
+    key = f'content:section:{name}:{generation}'
+    data = cache.get(key)
+    if data is None:
+        data = build_section(name)
+        cache.set(key, data, None)
+    return data
+
+
+def _cache_path(request):
+    """The path plus its parameters in canonical order; None if it has one outside CACHE_PARAMS."""
+    params = sorted(request.GET.lists())
+    if any(name not in CACHE_PARAMS for name, values in params):
+        return None
+    return f'{request.path}?{urlencode(params, doseq=True)}' if params else request.path
+
+
+def _response_key(generations, path):
+    stamp = ','.join(f'{name}={generation}' for name, generation in sorted(generations.items()))
+    digest = hashlib.md5(f'{stamp}|{path}'.encode()).hexdigest()
+    # Entries are (content, content type, {encoding: compressed content})
+    return f'content:encoded-response:{digest}'
+
+
+def _add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Let browsers and CDNs keep the body but always revalidate it
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def _matching_etag(request, etag):
+    """``etag`` in the encoding the client's If-None-Match holds it in."""
+    candidates = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    for encoding in ENCODINGS:
+        tagged = encoded_etag(etag, encoding)
+        if tagged in candidates or f'W/{tagged}' in candidates:
+            return tagged
+    return etag
+
+
+def _cached_response(request, entry, etag, last_modified):
+    content, content_type, variants = entry
+    encoding = choose_encoding(request, variants)
+    response = HttpResponse(variants[encoding] if encoding else content, content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return vary_on_encoding(_add_validators(response, encoded_etag(etag, encoding), last_modified))
+
+
+def cached_endpoint(dependencies):
+    """Cache the rendered body of a public GET view until a dependency is invalidated.
+
+    ``dependencies`` is a section name, a sequence of them, or a callable
+    receiving the view kwargs and returning the section names the response is
+    built from. Must wrap the
+    ``api_view`` so that hits are answered without going through DRF at all.
+
+    Responses carry an ETag and Last-Modified derived from the global content
+    version, and conditional requests matching them get a 304 before any cache
+    lookup, query or serializer runs. Bodies are stored with their gzip/brotli
+    encodings (see ``compression``) and served in the one the client prefers,
+    with the encoding appended to the ETag. Bodies and ETags are keyed on the
+    path and the CACHE_PARAMS it carries; requests with other parameters go
+    straight to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if callable(dependencies):
+                names = tuple(dependencies(**kwargs))
+            elif isinstance(dependencies, str):
+                names = (dependencies,)
+            else:
+                names = tuple(dependencies)
+            path = _cache_path(request)
+            if request.method not in ('GET', 'HEAD') or not names or path is None:
+                return view(request, *args, **kwargs)
+
+            version = get_content_version()
+            etag = '"%s"' % hashlib.md5(f'{version}|{path}'.encode()).hexdigest()
+            last_modified = version // 1_000_000_000
+            matched = _matching_etag(request, etag)
+            response = get_conditional_response(request, etag=matched, last_modified=last_modified)
+            if response is not None:
+                return vary_on_encoding(_add_validators(response, matched, last_modified))
+
+            key = _response_key(get_generations(names), path)
+            entry = cache.get(key)
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                if hasattr(response, 'render'):
+                    response.render()
+                entry = (response.content, response['Content-Type'], compress_variants(response.content))
+                cache.set(key, entry, None)
+            return _cached_response(request, entry, etag, last_modified)
+        return wrapped
+    return decorator
@@ -0,0 +1,74 @@
+"""Pre-compressed variants of cached response bodies.
+
+``cached_endpoint`` stores each body together with its gzip and brotli
+encodings, made once when the entry is built, and answers every later request
+with whichever one its ``Accept-Encoding`` prefers. Bodies smaller than
+``RESPONSE_COMPRESSION_MIN_BYTES`` and variants that don't come out smaller
+are not stored.
+"""
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only gzip variants are made without it
+    brotli = None
+
+# Preferred first when the client accepts several with the same q-value
+ENCODINGS = ('br', 'gzip')
+
+
+def compress_variants(content):
+    """``{encoding: body}`` for the encodings worth storing next to ``content``."""
+    if len(content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return {}
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, mode=brotli.MODE_TEXT, quality=11)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(content)}
+
+
+def accepted_encodings(header):
+    """``{coding: q}`` from an ``Accept-Encoding`` header."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted['gzip' if coding == 'x-gzip' else coding] = q
+    return accepted
+
+
+def choose_encoding(request, available):
+    """The encoding of ``available`` the request accepts with the highest q, or None."""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if not header or not available:
+        return None
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding in available:
+            q = accepted.get(encoding, accepted.get('*', 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+    return best
+
+
+def encoded_etag(etag, encoding):
+    """A strong ETag is per representation, so each encoding gets its own."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def vary_on_encoding(response):
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,142 @@
+"""Pre-render the public content endpoints to static JSON for nginx.
+
+Every export goes to ``<STATIC_EXPORT_ROOT>/<content version>/`` and the
+``current`` symlink is then swapped atomically, so nginx always serves one
+complete version. An export is the default response, and ``try_files`` ignores
+the query string, so requests with one (``?cursor=``, ``?page_size=``,
+``?fields=``, ``?omit=``, ``?icons=sprite`` ...) must go to Django::
+
+    map $args $api_export_root {
+        ''      /path/to/STATIC_EXPORT_ROOT/current;
+        default /nonexistent;
+    }
+
+    location /api/ {
+        root $api_export_root;
+        gzip_static on;
+        brotli_static on;
+        default_type application/json;
+        try_files $uri/index.json @django;
+    }
+
+    location @django { proxy_pass http://django; }
+"""
+import gzip
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from django.conf import settings
+from django.db import close_old_connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from .bundles import BUNDLES
+from .cache import get_content_version
+from .models import BlogPost
+from .sections import SECTIONS
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, .br files are skipped without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+KEEP_VERSIONS = 3
+EXPORT_DELAY = 2.0
+
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def export_paths():
+    paths = [reverse(name.replace('_', '-')) for name in SECTIONS]
+    paths += [reverse('bundle', kwargs={'name': name}) for name in BUNDLES]
+    paths.append(reverse('maintenance-status'))
+    paths.append(reverse('blog-list'))
+    slugs = BlogPost.objects.filter(is_active=True).values_list('slug', flat=True)
+    paths += [reverse('blog-detail', kwargs={'slug': slug}) for slug in slugs]
+    return paths
+
+
+def render_path(path):
+    match = resolve(path)
+    request = RequestFactory().get(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f'{path} returned {response.status_code}')
+    return response.content
+
+
+def _write_variants(target, content):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(content)
+    Path(f'{target}.gz').write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        Path(f'{target}.br').write_bytes(brotli.compress(content))
+
+
+def export_static_json(root=None):
+    """Write every public endpoint under ``root`` and point ``current`` at it.
+
+    Returns the directory of the exported version.
+    """
+    root = Path(root or settings.STATIC_EXPORT_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    version = str(get_content_version())
+    final_dir = root / version
+
+    if not final_dir.exists():
+        tmp_dir = Path(tempfile.mkdtemp(dir=root, prefix=f'.{version}-'))
+        try:
+            for path in export_paths():
+                _write_variants(tmp_dir / path.strip('/') / 'index.json', render_path(path))
+            os.chmod(tmp_dir, 0o755)
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # Another worker finished the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not final_dir.exists():
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    link_tmp = root / f'.current-{os.getpid()}-{threading.get_ident()}'
+    os.symlink(version, link_tmp)
+    os.replace(link_tmp, root / 'current')
+    _prune(root, keep=version)
+    return final_dir
+
+
+def _prune(root, keep):
+    versions = sorted((p for p in root.iterdir() if p.name.isdigit() and p.is_dir()), key=lambda p: int(p.name))
+    for old in versions[:-KEEP_VERSIONS]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _run_scheduled_export():
+    try:
+        export_static_json()
+    except Exception:
+        logger.exception('Static JSON export failed')
+    finally:
+        close_old_connections()
+
+
+def schedule_export():
+    """Debounced export after content writes; no-op unless STATIC_EXPORT_ROOT is set."""
+    global _timer
+    if not settings.STATIC_EXPORT_ROOT:
+        return
+    with _timer_lock:
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(EXPORT_DELAY, _run_scheduled_export)
+        _timer.daemon = True
+        _timer.start()
@@ -0,0 +1,137 @@
+"""Read-path serialization straight from ``values()`` rows.
+
+``row_serializer(SerializerClass)`` compiles a ModelSerializer once into a flat
+list of ``(key, column, converter)`` entries. Serializing a row is then a dict
+lookup per field plus a converter call only where the value needs one, instead
+of a model instance per row and DRF's per-field ``get_attribute`` /
+``to_representation`` dispatch. The output is the same JSON the serializer
+produces without a request in its context (as in the cached public sections).
+
+SerializerMethodFields have no column to read; their row-based equivalents are
+registered in ``COMPUTED``. A serializer with a field that can't be mapped gets
+no row serializer (``None``) and callers fall back to the ModelSerializer.
+"""
+from functools import lru_cache
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from .models import HeroSection
+from .serializers import HeroSectionSerializer, MenuItemSerializer
+
+# Field types whose to_representation() returns database values unchanged
+IDENTITY_FIELDS = (
+    serializers.CharField, serializers.EmailField, serializers.URLField, serializers.SlugField,
+    serializers.IntegerField, serializers.BooleanField, serializers.ReadOnlyField,
+)
+
+
+def _hero_background(row, context):
+    # HeroSectionSerializer.get_backgroundImage
+    name = row['background_image']
+    if name:
+        url = HeroSection._meta.get_field('background_image').storage.url(name)
+        request = (context or {}).get('request')
+        if request:
+            return request.build_absolute_uri(url)
+        return f"{settings.MEDIA_BASE_URL}{url}"
+    return None
+
+
+def _menu_children(row, context):
+    children = context['menu_children'].get(row['id'], [])
+    return row_serializer(MenuItemSerializer).many(children, context)
+
+
+# serializer -> {field name: (columns it reads, function(row, context))}
+COMPUTED = {
+    HeroSectionSerializer: {'backgroundImage': (('background_image',), _hero_background)},
+    MenuItemSerializer: {'children': (('id',), _menu_children)},
+}
+
+
+def _file_converter(field, storage):
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def convert(value):
+        name = getattr(value, 'name', value)  # FieldFile when read off an instance
+        if not name:
+            return None
+        return storage.url(name) if use_url else name
+    return convert
+
+
+class RowSerializer:
+    def __init__(self, model, columns, attnames, fields):
+        self.model = model
+        self.columns = columns
+        self.attnames = attnames
+        self.fields = fields
+
+    def to_dict(self, row, context=None):
+        data = {}
+        for key, column, convert in self.fields:
+            if column is None:
+                data[key] = convert(row, context)
+                continue
+            value = row[column]
+            data[key] = value if convert is None or value is None else convert(value)
+        return data
+
+    def many(self, rows, context=None):
+        to_dict = self.to_dict
+        return [to_dict(row, context) for row in rows]
+
+    def rows(self, queryset):
+        return queryset.values(*self.columns)
+
+    def from_instance(self, instance, context=None):
+        row = {column: getattr(instance, attname) for column, attname in zip(self.columns, self.attnames)}
+        return self.to_dict(row, context)
+
+
+def _compile(serializer_class):
+    model = serializer_class.Meta.model
+    computed = COMPUTED.get(serializer_class, {})
+    columns = {}
+    fields = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if name in computed:
+            needs, function = computed[name]
+            for column in needs:
+                columns[column] = model._meta.get_field(column).attname
+            fields.append((name, None, function))
+            continue
+        if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+            return None
+        if field.source == '*' or '.' in field.source:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+
+        if isinstance(field, serializers.FileField):
+            convert = _file_converter(field, model_field.storage)
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return None
+            convert = None
+        elif type(field) in IDENTITY_FIELDS or (type(field) is serializers.JSONField and not field.binary):
+            convert = None
+        else:
+            # Dates, decimals and custom fields (ImageVariantsField, ...)
+            convert = field.to_representation
+        columns[field.source] = model_field.attname
+        fields.append((name, field.source, convert))
+    return RowSerializer(model, tuple(columns), tuple(columns.values()), tuple(fields))
+
+
+@lru_cache(maxsize=None)
+def row_serializer(serializer_class):
+    """The compiled RowSerializer for ``serializer_class``, or None if it can't be compiled."""
+    return _compile(serializer_class)
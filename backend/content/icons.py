@@ -0,0 +1,113 @@
+"""Minified, deduplicated SVG icons and the sprite sheet built from them.
+
+Saving a model with ``icon_svg`` minifies the markup and registers it in
+SvgIcon under a hash of the minified text, so repeated icons share one id.
+The public list endpoints can then answer ``?icons=sprite`` with
+``icon_ref: "<sprite url>#i-<id>"`` references into one cacheable sprite instead
+of repeating the full markup in every item.
+"""
+import hashlib
+import re
+from django.core.cache import cache
+from django.urls import reverse
+from .cache import get_generations
+
+# Sections whose items carry icon_svg
+ICON_SECTIONS = ('services', 'why_choose_us', 'working_process', 'contact_info')
+
+_REMOVE_RES = [
+    re.compile(r'<\?xml.*?\?>', re.S),
+    re.compile(r'<!DOCTYPE[^>]*>', re.S | re.I),
+    re.compile(r'<!--.*?-->', re.S),
+    re.compile(r'<(metadata|script|sodipodi:namedview)\b.*?</\1\s*>', re.S | re.I),
+    re.compile(r'<(sodipodi:namedview|script)\b[^>]*/>', re.S | re.I),
+    # Editor attributes and inline event handlers
+    re.compile(r'\s(?:xmlns:(?:sodipodi|inkscape)|sodipodi:[\w-]+|inkscape:[\w-]+|on\w+)\s*=\s*(?:"[^"]*"|\'[^\']*\')', re.I),
+]
+_BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+_WHITESPACE_RE = re.compile(r'\s+')
+_TAG_SPACE_RE = re.compile(r'\s*(/?>)')
+_ROOT_RE = re.compile(r'^<svg\b([^>]*)>(.*)</svg>$', re.S | re.I)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+# Root attributes that make no sense on a <symbol>
+_ROOT_ONLY_ATTRS = {'xmlns', 'xmlns:xlink', 'width', 'height', 'class', 'version', 'id', 'x', 'y'}
+
+
+def minify_svg(svg):
+    """Strip comments, editor metadata, scripts and insignificant whitespace."""
+    if not svg:
+        return svg
+    for pattern in _REMOVE_RES:
+        svg = pattern.sub('', svg)
+    svg = _BETWEEN_TAGS_RE.sub('><', svg.strip())
+    svg = _WHITESPACE_RE.sub(' ', svg)
+    return _TAG_SPACE_RE.sub(r'\1', svg)
+
+
+def icon_digest(svg):
+    return hashlib.sha256(svg.encode()).hexdigest()[:16]
+
+
+def register_icon(svg):
+    """Return ``(minified svg, icon id)`` for ``svg``, adding it to the registry if new."""
+    from .models import SvgIcon
+    minified = minify_svg(svg)
+    if not minified:
+        return minified, ''
+    digest = icon_digest(minified)
+    SvgIcon.objects.get_or_create(id=digest, defaults={'svg': minified})
+    return minified, digest
+
+
+def symbol_id(icon_id):
+    return f'i-{icon_id}'
+
+
+def _symbol(icon):
+    match = _ROOT_RE.match(icon.svg)
+    if not match:
+        return ''
+    attrs = ''.join(
+        f' {name}={value}' for name, value in _ATTR_RE.findall(match.group(1))
+        if name.lower() not in _ROOT_ONLY_ATTRS
+    )
+    return f'<symbol id="{symbol_id(icon.id)}"{attrs}>{match.group(2)}</symbol>'
+
+
+def build_sprite():
+    from .models import ContactInfo, Service, SvgIcon, WhyChooseUsFeature, WorkingProcessStep
+    ids = set()
+    for model in (Service, WhyChooseUsFeature, WorkingProcessStep, ContactInfo):
+        ids.update(model.objects.filter(is_active=True).exclude(icon_id='').values_list('icon_id', flat=True))
+    symbols = ''.join(_symbol(icon) for icon in SvgIcon.objects.filter(id__in=ids).order_by('id'))
+    return f'<svg xmlns="http://www.w3.org/2000/svg">{symbols}</svg>'
+
+
+def get_sprite():
+    """``(version, body)`` of the sprite of every active icon, rebuilt when an icon section changes."""
+    generations = get_generations(ICON_SECTIONS)
+    stamp = ','.join(str(generations[name]) for name in ICON_SECTIONS)
+    key = f'content:icon-sprite:{hashlib.md5(stamp.encode()).hexdigest()}'
+    sprite = cache.get(key)
+    if sprite is None:
+        body = build_sprite()
+        sprite = (hashlib.sha256(body.encode()).hexdigest()[:12], body)
+        cache.set(key, sprite, None)
+    return sprite
+
+
+def sprite_url():
+    version, body = get_sprite()
+    return f'{reverse("icon-sprite")}?v={version}'
+
+
+def with_icon_refs(items):
+    """Replace ``icon_svg`` in serialized items by a ``<use href>`` reference into the sprite."""
+    url = sprite_url()
+    result = []
+    for item in items:
+        item = dict(item)
+        item.pop('icon_svg', None)
+        item['icon_ref'] = f'{url}#{symbol_id(item["icon_id"])}' if item.get('icon_id') else None
+        result.append(item)
+    return result
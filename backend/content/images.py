@@ -0,0 +1,260 @@
+"""Responsive WebP/AVIF derivatives of uploaded content images.
+
+On save, every image field whose file changed is queued on a small thread
+pool. The worker writes width-stepped variants next to the original
+(``projects/site.jpg`` -> ``projects/site.jpg-640w.webp``) and records them in
+the row's ``image_meta``, which the serializers turn into srcset-ready URL maps.
+The entry also carries the intrinsic size, dominant color and a tiny inline
+placeholder so the frontend can reserve space and paint before the image loads.
+"""
+import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageFilter, ImageOps, features
+from .models import (
+    AboutSection, BlogPost, ClientLogo, HeroSection, Project, Service,
+    SiteSettings, TeamMember, Testimonial,
+)
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = {
+    SiteSettings: ('logo', 'mobile_logo'),
+    HeroSection: ('background_image',),
+    Service: ('image',),
+    Testimonial: ('image',),
+    Project: ('image',),
+    AboutSection: ('image1', 'image2'),
+    ClientLogo: ('logo',),
+    BlogPost: ('image',),
+    TeamMember: ('image',),
+}
+
+# Pillow encoder options per output format
+FORMAT_OPTIONS = {
+    'avif': {'quality': 55, 'speed': 6},
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+}
+
+# Bump when entries or variant names change so generate_image_variants reprocesses old ones
+META_VERSION = 3
+
+LQIP_WIDTH = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+# Serialises read-modify-write of image_meta when two fields of a row finish together
+_meta_lock = threading.Lock()
+_pending = set()
+# Jobs queued or running; more are dropped and left to generate_image_variants
+_slots = threading.BoundedSemaphore(settings.IMAGE_VARIANT_QUEUE_SIZE)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS, thread_name_prefix='image-variants',
+            )
+        return _executor
+
+
+def variant_formats():
+    # AVIF needs a Pillow built with libavif; fall back to WebP only
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if features.check(fmt)]
+
+
+def variant_widths(width):
+    """Widths to generate for an original ``width`` pixels wide; never upscales."""
+    widths = [w for w in settings.IMAGE_VARIANT_WIDTHS if w < width]
+    if width <= max(settings.IMAGE_VARIANT_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def variant_name(name, width, fmt):
+    # The source extension stays, so a.jpg and a.png don't share variants
+    return f'{name}-{width}w.{fmt}'
+
+
+def prepare_image(image):
+    """Apply the EXIF rotation and normalise to RGB(A) before resizing."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def resize_to_width(image, width):
+    if width >= image.width:
+        return image
+    return image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+
+
+def encode_image(image, fmt, quality=None):
+    options = dict(FORMAT_OPTIONS.get(fmt, {}))
+    if quality is not None:
+        options['quality'] = quality
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def dominant_color(image):
+    """Most common color of ``image`` after reducing it to a small palette, as ``#rrggbb``."""
+    small = image.convert('RGB')
+    small.thumbnail((64, 64))
+    palette_image = small.quantize(colors=5)
+    count, index = max(palette_image.getcolors())
+    r, g, b = palette_image.getpalette()[index * 3:index * 3 + 3]
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def lqip(image):
+    """A blurred ~16px WebP of ``image`` as a data URI, a few hundred bytes."""
+    small = resize_to_width(image, LQIP_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    data = encode_image(small, 'webp', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(data).decode()
+
+
+def generate_variants(name):
+    """Write every variant of the stored image ``name`` and return its meta entry."""
+    with default_storage.open(name, 'rb') as f:
+        image = prepare_image(Image.open(f))
+    width, height = image.size
+    formats = variant_formats()
+    entry = {
+        'source': name,
+        'version': META_VERSION,
+        'width': width,
+        'height': height,
+        'color': dominant_color(image),
+        'lqip': lqip(image),
+    }
+    for fmt in formats:
+        entry[fmt] = {}
+    for target in variant_widths(width):
+        resized = resize_to_width(image, target)
+        for fmt in formats:
+            path = variant_name(name, target, fmt)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            entry[fmt][str(target)] = default_storage.save(path, ContentFile(encode_image(resized, fmt)))
+    return entry
+
+
+def variant_paths(entry):
+    return {path for fmt in FORMAT_OPTIONS for path in (entry or {}).get(fmt, {}).values()}
+
+
+def source_in_use(name):
+    return any(
+        model.objects.filter(**{field: name}).exists()
+        for model, fields in IMAGE_FIELDS.items() for field in fields
+    )
+
+
+def delete_variants(entry, keep=None):
+    """Delete the variants of ``entry`` that ``keep`` doesn't list.
+
+    Rows pointing at the same file share its variants, so they stay until no
+    row uses that file; only a reprocessed file drops its outdated ones.
+    """
+    paths = variant_paths(entry) - variant_paths(keep)
+    source = (entry or {}).get('source')
+    if not paths or (source != (keep or {}).get('source') and source_in_use(source)):
+        return
+    for path in paths:
+        default_storage.delete(path)
+
+
+def stale_fields(instance):
+    """Image fields of ``instance`` whose recorded entry doesn't match the current file."""
+    meta = instance.image_meta or {}
+    stale = []
+    for field in IMAGE_FIELDS[type(instance)]:
+        name = getattr(instance, field).name or ''
+        entry = meta.get(field) or {}
+        if entry.get('source', '') != name or (name and entry.get('version') != META_VERSION):
+            stale.append(field)
+    return stale
+
+
+def _update_meta(model, pk, field, name, entry):
+    """Store ``entry`` for ``field`` unless the row or its file changed meanwhile."""
+    from .cache import invalidate_model
+    with _meta_lock:
+        row = model.objects.filter(pk=pk).values(field, 'image_meta').first()
+        if row is None or (row[field] or '') != name:
+            return False
+        meta = row['image_meta'] or {}
+        previous = meta.get(field)
+        if entry:
+            meta[field] = entry
+        else:
+            meta.pop(field, None)
+        # update() skips post_save, so this doesn't re-queue the row
+        model.objects.filter(pk=pk).update(image_meta=meta)
+    if previous:
+        # A reprocessed file writes its variants under the same names
+        delete_variants(previous, keep=entry)
+    invalidate_model(model)
+    return True
+
+
+def process_field(model, pk, field, name):
+    """Generate and record the variants of one field; runs on the worker pool."""
+    close_old_connections()
+    try:
+        entry = None
+        if name:
+            try:
+                entry = generate_variants(name)
+            except (OSError, Image.DecompressionBombError, ValueError):
+                logger.exception('Could not generate variants of %s', name)
+                return
+        if not _update_meta(model, pk, field, name, entry) and entry:
+            # The upload was replaced while we worked; its own job records the new file
+            delete_variants(entry)
+    finally:
+        _pending.discard((model, pk, field, name))
+        close_old_connections()
+
+
+def _process_queued(*key):
+    try:
+        process_field(*key)
+    finally:
+        _slots.release()
+
+
+def schedule_variants(instance):
+    for field in stale_fields(instance):
+        key = (type(instance), instance.pk, field, getattr(instance, field).name or '')
+        if key in _pending:
+            continue
+        if not _slots.acquire(blocking=False):
+            logger.warning('Image variant queue is full, skipping %s; run generate_image_variants later', key[3])
+            continue
+        _pending.add(key)
+        _get_executor().submit(_process_queued, *key)
+
+
+def image_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: schedule_variants(instance))
+
+
+def image_deleted(sender, instance, **kwargs):
+    for entry in (instance.image_meta or {}).values():
+        transaction.on_commit(lambda entry=entry: delete_variants(entry))
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+
+# (stat signature, body) of the state file as last read by this worker
+_cached = (None, None)
+
+
+def state_path():
+    return Path(settings.CONTENT_STATE_DIR) / 'maintenance.json'
+
+
+def write_maintenance_state(enabled):
+    """Atomically replace the state file so readers never see a partial write."""
+    path = state_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.maintenance-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'maintenance_mode': bool(enabled)}, f, separators=(',', ':'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def maintenance_status_body():
+    """Return the JSON body for maintenance-status/.
+
+    Costs one stat() per call; the file is only re-read after it was replaced,
+    and the database is only consulted to create it the first time.
+    """
+    global _cached
+    path = state_path()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        from .models import SiteSettings
+        site_settings = SiteSettings.load()
+        write_maintenance_state(site_settings.maintenance_mode if site_settings else False)
+        st = os.stat(path)
+
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _cached[0] != signature:
+        _cached = (signature, path.read_bytes())
+    return _cached[1]
@@ -0,0 +1,113 @@
+import io
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from content import bundles, sections
+from content.parsers import ORJSONParser
+from content.renderers import ORJSONRenderer, orjson
+from content.urls import router
+
+
+def analytics_payload(period, buckets, ips_per_bucket):
+    """A response shaped like ``analytics_stats`` with ``ips_per_bucket`` addresses per row."""
+    rng = random.Random(buckets * ips_per_bucket)
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    stats = []
+    for index in range(buckets):
+        if period == 'daily':
+            key, value = 'date', (today - timedelta(days=index)).date()
+        elif period == 'monthly':
+            key, value = 'month', (today.replace(day=1) - timedelta(days=31 * index)).replace(day=1)
+        else:
+            key, value = 'year', today.replace(year=today.year - index, month=1, day=1)
+        ip_data = [
+            {'ip_address': f'{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+             'visit_count': rng.randint(1, 40)}
+            for _ in range(ips_per_bucket)
+        ]
+        stats.append({key: value, 'count': sum(row['visit_count'] for row in ip_data), 'ip_data': ip_data})
+
+    def counts(prefix, size):
+        return [{'value': f'{prefix}{index}', 'count': rng.randint(1, 5000)} for index in range(size)]
+
+    return {
+        'period': period,
+        'stats': stats,
+        'total': sum(row['count'] for row in stats),
+        'unique_visitors': buckets * ips_per_bucket,
+        'top_pages': [{'path': row['value'], 'count': row['count']} for row in counts('/page-', 10)],
+        'device_stats': [{'device_type': row['value'], 'count': row['count']} for row in counts('device-', 3)],
+        'browser_stats': [{'browser': row['value'], 'count': row['count']} for row in counts('browser-', 6)],
+        'country_stats': [{'country': row['value'], 'count': row['count']} for row in counts('country-', 10)],
+        'referrer_stats': [{'referrer': row['value'], 'count': row['count']} for row in counts('https://ref.example/', 10)],
+        'traffic_source_stats': [{'traffic_source': row['value'], 'count': row['count']} for row in counts('source-', 8)],
+        'social_media_stats': [{'traffic_source': row['value'], 'count': row['count']} for row in counts('social-', 6)],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare the orjson renderer/parser against the stock DRF JSON ones on every content and analytics response'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help='Renders/parses per payload and implementation')
+        parser.add_argument(
+            '--ips-per-day', type=int, default=300,
+            help='Distinct visitor IPs per day in the synthetic analytics responses',
+        )
+
+    def payloads(self, ips_per_day):
+        for name in sections.SECTIONS:
+            yield f'section {name}', sections.build_section(name)
+        for name in bundles.BUNDLES:
+            yield f'bundle {name}', {section: sections.build_section(section) for section in bundles.BUNDLES[name]}
+        for prefix, viewset, basename in router.registry:
+            yield f'admin {prefix}', viewset.serializer_class(viewset.queryset.all(), many=True).data
+        yield 'analytics daily', analytics_payload('daily', 30, ips_per_day)
+        yield 'analytics monthly', analytics_payload('monthly', 12, ips_per_day * 20)
+        yield 'analytics yearly', analytics_payload('yearly', 3, ips_per_day * 100)
+
+    def run(self, function, count):
+        function()  # warm up
+        start = time.perf_counter()
+        for _ in range(count):
+            function()
+        return (time.perf_counter() - start) / count
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed; ORJSONRenderer is the stock renderer here')
+        count = options['iterations']
+        stock_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), ORJSONParser()
+        mismatched = []
+        totals = [0.0, 0.0, 0.0, 0.0]
+
+        self.stdout.write(f'Iterations per payload: {count}')
+        self.stdout.write(f'{"payload":<36}{"KiB":>8}{"render":>18}{"parse":>18}')
+        for label, data in self.payloads(options['ips_per_day']):
+            body = stock_renderer.render(data)
+            if fast_renderer.render(data) != body:
+                mismatched.append(label)
+            timings = (
+                self.run(lambda: stock_renderer.render(data), count),
+                self.run(lambda: fast_renderer.render(data), count),
+                self.run(lambda: stock_parser.parse(io.BytesIO(body)), count),
+                self.run(lambda: fast_parser.parse(io.BytesIO(body)), count),
+            )
+            totals = [total + timing for total, timing in zip(totals, timings)]
+            self.stdout.write(
+                f'{label:<36}{len(body) / 1024:>8.1f}'
+                f'{timings[0] / timings[1]:>17.1f}x{timings[2] / timings[3]:>17.1f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'All payloads: render {totals[0] * 1000:.2f} -> {totals[1] * 1000:.2f} ms '
+            f'({totals[0] / totals[1]:.1f}x), parse {totals[2] * 1000:.2f} -> {totals[3] * 1000:.2f} ms '
+            f'({totals[2] / totals[3]:.1f}x) per pass'
+        ))
+        if mismatched:
+            raise CommandError(f'orjson output differs from the stock renderer for: {", ".join(mismatched)}')
@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from content.models import SiteSettings
+from content.views import maintenance_status_view
+
+
+@api_view(['GET'])
+def legacy_maintenance_status_view(request):
+    """The previous implementation, kept here as the baseline."""
+    settings = SiteSettings.objects.first()
+    return Response({'maintenance_mode': settings.maintenance_mode if settings else False})
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec of the maintenance-status fast path against the old DRF + database view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per run')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        factory = RequestFactory()
+
+        def request(view):
+            response = view(factory.get('/api/maintenance-status/'))
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+        def run(view):
+            request(view)  # warm up
+            start = time.perf_counter()
+            for _ in range(count):
+                request(view)
+            return count / (time.perf_counter() - start)
+
+        before = run(legacy_maintenance_status_view)
+        after = run(maintenance_status_view)
+
+        self.stdout.write(f'Requests per run: {count}')
+        self.stdout.write(f'Before (DRF + SiteSettings query): {before:,.0f} req/s')
+        self.stdout.write(f'After  (state file fast path):     {after:,.0f} req/s')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {after / before:.1f}x'))
@@ -0,0 +1,80 @@
+import itertools
+import random
+import sqlite3
+import statistics
+import string
+import time
+from django.core.management.base import BaseCommand
+from content.search import CREATE_SEARCH_TABLE_SQL, SEARCH_TABLE, build_match_query, search_sql
+
+
+class Command(BaseCommand):
+    help = 'Benchmark FTS5 search against an icontains-style LIKE scan on a synthetic in-memory corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=100000, help='Synthetic documents to index')
+        parser.add_argument('--queries', type=int, default=200, help='FTS5 queries to time')
+        parser.add_argument('--scan-queries', type=int, default=10, help='LIKE scan queries to time')
+        parser.add_argument('--seed', type=int, default=8)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+            for _ in range(20000)
+        ]
+        # Zipf-like word frequencies, as in real text
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+        def text(words):
+            return ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=words))
+
+        db = sqlite3.connect(':memory:')
+        db.execute(CREATE_SEARCH_TABLE_SQL)
+        db.execute('CREATE TABLE plain (kind TEXT, object_id INTEGER, title TEXT, body TEXT)')
+
+        start = time.perf_counter()
+        rows = [('blog', i, text(6), f'<p>{text(150)}</p>') for i in range(options['documents'])]
+        generated = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.executemany(f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, body) VALUES (?, ?, ?, ?)', rows)
+        db.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        indexed = time.perf_counter() - start
+        db.executemany('INSERT INTO plain VALUES (?, ?, ?, ?)', rows)
+        db.commit()
+
+        # Mid-frequency terms: common enough to match, rare enough to be selective
+        candidates = vocabulary[50:2000]
+        queries = [' '.join(rng.sample(candidates, rng.randint(1, 2))) for _ in range(options['queries'])]
+
+        sql = search_sql().replace('%s', '?')
+        fts_times, hits = [], 0
+        for query in queries:
+            start = time.perf_counter()
+            result = db.execute(sql, ['[', ']', '[', ']', build_match_query(query), 20]).fetchall()
+            fts_times.append(time.perf_counter() - start)
+            hits += len(result)
+
+        # What an icontains filter ordered for display does: every row is read
+        scan_times = []
+        for query in queries[:options['scan_queries']]:
+            term = f'%{query.split()[0]}%'
+            start = time.perf_counter()
+            db.execute(
+                'SELECT kind, object_id FROM plain WHERE title LIKE ? OR body LIKE ? '
+                'ORDER BY object_id DESC LIMIT 20', [term, term]
+            ).fetchall()
+            scan_times.append(time.perf_counter() - start)
+
+        def ms(values):
+            ordered = sorted(values)
+            p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+            return f'mean {statistics.mean(values) * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms'
+
+        self.stdout.write(f'Documents: {options["documents"]:,} (generated in {generated:.1f}s, indexed in {indexed:.1f}s)')
+        self.stdout.write(f'FTS5 MATCH + bm25 + snippet ({len(fts_times)} queries, {hits / len(fts_times):.1f} hits avg): {ms(fts_times)}')
+        self.stdout.write(f'LIKE %term% scan ({len(scan_times)} queries): {ms(scan_times)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Speed-up: {statistics.mean(scan_times) / statistics.mean(fts_times):.0f}x'
+        ))
@@ -0,0 +1,115 @@
+import json
+import time
+from collections import defaultdict
+from django.core.management.base import BaseCommand, CommandError
+from content import sections
+from content.models import (
+    AboutSection, BlogPost, BlogsSection, ClientLogo, ColorPalette, ContactInfo, ContactSection,
+    FAQ, HeroSection, MenuItem, Project, Service, ServicesSection, SiteSettings, TeamMember,
+    TeamSection, Testimonial, TestimonialsSection, WhyChooseUsFeature, WhyChooseUsSection,
+    WorkingProcessSection, WorkingProcessStep,
+)
+from content.serializers import (
+    AboutSectionSerializer, BlogPostSerializer, BlogsSectionSerializer, ClientLogoSerializer,
+    ColorPaletteSerializer, ContactInfoSerializer, ContactSectionSerializer, FAQSerializer,
+    HeroSectionSerializer, MenuItemSerializer, ProjectSerializer, ServiceSerializer,
+    ServicesSectionSerializer, SiteSettingsSerializer, TeamMemberSerializer,
+    TeamSectionSerializer, TestimonialSerializer, TestimonialsSectionSerializer,
+    WhyChooseUsFeatureSerializer, WhyChooseUsSectionSerializer, WorkingProcessSectionSerializer,
+    WorkingProcessStepSerializer,
+)
+
+
+def _single(model, serializer_class):
+    instance = model.load()
+    return serializer_class(instance).data if instance else {}
+
+
+def _active(model, serializer_class, ordering='order'):
+    return serializer_class(model.objects.filter(is_active=True).order_by(ordering), many=True).data
+
+
+def _menu_items():
+    items = list(MenuItem.objects.filter(is_active=True).order_by('order', 'id'))
+    children = defaultdict(list)
+    for item in items:
+        if item.parent_id is not None:
+            children[item.parent_id].append(item)
+    return MenuItemSerializer(items, many=True, context={'menu_children': children}).data
+
+
+def _color_palette():
+    palette = ColorPalette.objects.filter(is_active=True).first()
+    return ColorPaletteSerializer(palette).data if palette else dict(sections.DEFAULT_COLOR_PALETTE)
+
+
+def _blog_posts():
+    posts = BlogPost.objects.filter(is_active=True).order_by('-date_published', '-id')[:6]
+    return BlogPostSerializer(posts, many=True).data
+
+
+# The previous ModelSerializer builders, kept here as the baseline
+LEGACY = {
+    'site_settings': lambda: _single(SiteSettings, SiteSettingsSerializer),
+    'menu_items': _menu_items,
+    'hero_sections': lambda: _active(HeroSection, HeroSectionSerializer),
+    'color_palette': _color_palette,
+    'about_section': lambda: _single(AboutSection, AboutSectionSerializer),
+    'services_section': lambda: _single(ServicesSection, ServicesSectionSerializer),
+    'services': lambda: _active(Service, ServiceSerializer),
+    'projects': lambda: _active(Project, ProjectSerializer, ordering='-created_at'),
+    'why_choose_us': lambda: _active(WhyChooseUsFeature, WhyChooseUsFeatureSerializer),
+    'why_choose_us_section': lambda: _single(WhyChooseUsSection, WhyChooseUsSectionSerializer),
+    'working_process': lambda: _active(WorkingProcessStep, WorkingProcessStepSerializer),
+    'working_process_section': lambda: _single(WorkingProcessSection, WorkingProcessSectionSerializer),
+    'client_logos': lambda: _active(ClientLogo, ClientLogoSerializer),
+    'testimonials': lambda: _active(Testimonial, TestimonialSerializer),
+    'testimonials_section': lambda: _single(TestimonialsSection, TestimonialsSectionSerializer),
+    'contact_info': lambda: _active(ContactInfo, ContactInfoSerializer),
+    'contact_section': lambda: _single(ContactSection, ContactSectionSerializer),
+    'blog_posts': _blog_posts,
+    'blogs_section': lambda: _single(BlogsSection, BlogsSectionSerializer),
+    'team_members': lambda: _active(TeamMember, TeamMemberSerializer),
+    'team_section': lambda: _single(TeamSection, TeamSectionSerializer),
+    'faqs': lambda: _active(FAQ, FAQSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare builds/sec of the values() read path against the ModelSerializers, per public section'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Builds per section and implementation')
+        parser.add_argument('--section', action='append', choices=sorted(sections.SECTIONS), help='Only these sections')
+
+    def run(self, builder, count):
+        builder()  # warm up
+        start = time.perf_counter()
+        for _ in range(count):
+            builder()
+        return count / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        count = options['iterations']
+        names = options['section'] or list(sections.SECTIONS)
+        mismatched = []
+
+        self.stdout.write(f'Builds per run: {count}')
+        self.stdout.write(f'{"section":<26}{"before/s":>12}{"after/s":>12}{"speed-up":>10}')
+        total_before = total_after = 0
+        for name in names:
+            builder = sections.SECTIONS[name][0]
+            if json.dumps(LEGACY[name]()) != json.dumps(builder()):
+                mismatched.append(name)
+            before = self.run(LEGACY[name], count)
+            after = self.run(builder, count)
+            total_before += 1 / before
+            total_after += 1 / after
+            self.stdout.write(f'{name:<26}{before:>12,.0f}{after:>12,.0f}{after / before:>9.1f}x')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'All sections: {1 / total_before:,.1f} -> {1 / total_after:,.1f} full builds/s '
+            f'({total_before / total_after:.1f}x)'
+        ))
+        if mismatched:
+            raise CommandError(f'Output differs from the ModelSerializer for: {", ".join(mismatched)}')
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from content.export import export_paths, export_static_json
+
+
+class Command(BaseCommand):
+    help = 'Materialize every public content endpoint as static JSON (+ .gz/.br) for nginx'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default=None, help='Export root (defaults to STATIC_EXPORT_ROOT)')
+
+    def handle(self, *args, **options):
+        root = options['output'] or settings.STATIC_EXPORT_ROOT
+        if not root:
+            raise CommandError('Set STATIC_EXPORT_ROOT or pass --output')
+
+        version_dir = export_static_json(root)
+        self.stdout.write(f'Exported {len(export_paths())} endpoints')
+        self.stdout.write(self.style.SUCCESS(f'Current version: {version_dir}'))
@@ -0,0 +1,53 @@
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ckeditor_uploader.utils import get_thumb_filename, storage
+from content.models import BlogPost
+from content.uploads import referenced_uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete CKEditor uploads that no blog post content references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List what would be deleted without deleting it')
+        parser.add_argument(
+            '--min-age', type=int, default=24,
+            help='Keep files younger than this many hours (uploaded into a post not saved yet)',
+        )
+
+    def walk(self, path):
+        try:
+            directories, files = storage.listdir(path)
+        except FileNotFoundError:
+            return
+        for name in files:
+            yield os.path.join(path, name)
+        for directory in directories:
+            yield from self.walk(os.path.join(path, directory))
+
+    def handle(self, *args, **options):
+        referenced = set()
+        for content in BlogPost.objects.values_list('content', flat=True).iterator():
+            for name in referenced_uploads(content):
+                referenced.update((name, get_thumb_filename(name)))
+
+        cutoff = timezone.now() - timedelta(hours=options['min_age'])
+        deleted = freed = 0
+        for name in self.walk(settings.CKEDITOR_UPLOAD_PATH.rstrip('/')):
+            if name in referenced or storage.get_modified_time(name) > cutoff:
+                continue
+            size = storage.size(name)
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            deleted += 1
+            freed += size
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} unreferenced uploads ({freed / 1024:.0f} KiB); {len(referenced)} referenced'
+        ))
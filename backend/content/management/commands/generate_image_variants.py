@@ -0,0 +1,38 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from content.images import IMAGE_FIELDS, process_field, stale_fields
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the WebP/AVIF variants, dimensions, dominant color and placeholder '
+        'of content images that predate the pipeline or an upgrade of it'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Reprocess images that are already up to date')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 2,
+            help='Images processed in parallel (Pillow releases the GIL while resizing and encoding)',
+        )
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model, fields in IMAGE_FIELDS.items():
+            for instance in model.objects.all():
+                todo = fields if options['force'] else stale_fields(instance)
+                for field in todo:
+                    name = getattr(instance, field).name or ''
+                    if name or field in (instance.image_meta or {}):
+                        jobs.append((model, instance.pk, field, name))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            for _ in executor.map(lambda job: process_field(*job), jobs):
+                pass
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {len(jobs)} images in {elapsed:.1f}s with {options["workers"]} workers'
+        ))
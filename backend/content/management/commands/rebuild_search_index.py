@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from content.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for blog posts, projects, services and FAQs'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents'))
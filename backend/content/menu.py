@@ -0,0 +1,90 @@
+from collections import defaultdict
+from functools import partial
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .fastserializers import row_serializer
+from .models import MenuItem
+from .serializers import MenuItemSerializer
+
+
+def menu_tree():
+    """Serialize every active menu item with its nested children in one query.
+
+    Keeps the shape ``menu-items/`` has always returned: a flat list of all
+    active items ordered by ``order``, each carrying its subtree in
+    ``children``.
+    """
+    serializer = row_serializer(MenuItemSerializer)
+    rows = list(serializer.rows(MenuItem.objects.filter(is_active=True).order_by('order', 'id')))
+    children = defaultdict(list)
+    for row in rows:
+        if row['parent'] is not None:
+            children[row['parent']].append(row)
+    return serializer.many(rows, {'menu_children': children})
+
+
+SYNC_FIELDS = ('name', 'url', 'order', 'parent_id', 'is_active')
+
+
+def _sync_state(item):
+    return tuple(getattr(item, field) for field in SYNC_FIELDS)
+
+
+def _check_cycles(items, existing):
+    # menu_tree() nests children recursively, so a cycle would never end
+    parent_of = {pk: item.parent_id for pk, item in existing.items()}
+    parent_of.update((item.pk, item.parent_id) for data, item in items)
+    for data, item in items:
+        seen = {item.pk}
+        pk = parent_of.get(item.pk)
+        while pk is not None:
+            if pk in seen:
+                raise ValidationError(f'Menu item "{item.name}" is its own ancestor')
+            seen.add(pk)
+            pk = parent_of.get(pk)
+
+
+def sync_menu(submitted):
+    """Make the menu match ``submitted`` (the admin editor's flat item list).
+
+    Items whose ``id`` already exists are updated in place, others are created
+    and rows missing from the submission are deleted, all in one transaction
+    and with a constant number of statements. ``parent`` may point at an
+    existing id or at the client-side id of another submitted item. Raises
+    ValidationError, writing nothing, if the parents form a cycle.
+    """
+    from .cache import invalidate_model
+
+    with transaction.atomic():
+        existing = MenuItem.objects.in_bulk()
+        original = {pk: _sync_state(item) for pk, item in existing.items()}
+
+        items = []
+        for data in submitted:
+            item = existing.get(data.get('id')) or MenuItem()
+            item.name = data['name']
+            item.url = data['url']
+            item.order = data['order']
+            item.is_active = data.get('is_active', True)
+            items.append((data, item))
+
+        # New items are inserted first and linked to their parents once every pk is known
+        MenuItem.objects.bulk_create([item for data, item in items if item.pk is None])
+        # Items sent without an id can't be referenced as a parent
+        pk_for = {data['id']: item.pk for data, item in items if data.get('id')}
+
+        changed = []
+        for data, item in items:
+            parent_id = pk_for.get(data['parent']) if data.get('parent') else None
+            item.parent_id = parent_id if parent_id != item.pk else None
+            if _sync_state(item) != original.get(item.pk):
+                changed.append(item)
+        _check_cycles(items, existing)
+        MenuItem.objects.bulk_update(changed, ['name', 'url', 'order', 'parent', 'is_active'])
+
+        stale = set(existing) - {item.pk for data, item in items}
+        if stale:
+            MenuItem.objects.filter(pk__in=stale).delete()
+
+        # bulk_create/bulk_update bypass the model signals
+        transaction.on_commit(partial(invalidate_model, MenuItem))
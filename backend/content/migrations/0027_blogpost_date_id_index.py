@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0026_alter_blogpost_content'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['date_published', 'id'], name='content_blog_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+from html.parser import HTMLParser
+from django.db import migrations
+
+# Frozen copies of content.search as of this migration, so later edits there
+# can't change what it does
+SEARCH_TABLE = 'content_search'
+
+CREATE_SEARCH_TABLE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+
+class TextExtractor(HTMLParser):
+    SKIP = {'script', 'style'}
+    BLOCK = {'p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'blockquote'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skipping += 1
+        elif tag in self.BLOCK:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skipping:
+            self.skipping -= 1
+        elif tag in self.BLOCK:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def strip_html(value):
+    extractor = TextExtractor()
+    extractor.feed(value or '')
+    extractor.close()
+    return ' '.join(''.join(extractor.parts).split())
+
+
+def documents(apps):
+    for post in apps.get_model('content', 'BlogPost').objects.filter(is_active=True):
+        yield 'blog', post.pk, post.title, f'{post.excerpt}\n{strip_html(post.content)}'
+    for project in apps.get_model('content', 'Project').objects.filter(is_active=True):
+        yield 'project', project.pk, project.title, f'{project.description}\n{project.technologies}'
+    for service in apps.get_model('content', 'Service').objects.filter(is_active=True):
+        yield 'service', service.pk, service.name, service.description
+    for faq in apps.get_model('content', 'FAQ').objects.filter(is_active=True):
+        yield 'faq', faq.pk, faq.question, faq.answer
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SEARCH_TABLE_SQL)
+    # Index what already exists; the post_save signals keep it current from here on
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)',
+            list(documents(apps)),
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0027_blogpost_date_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
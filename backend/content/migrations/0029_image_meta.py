@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0028_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutsection',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='clientlogo',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='herosection',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sitesettings',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
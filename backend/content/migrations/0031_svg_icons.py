@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:32
+
+import hashlib
+import re
+from django.db import migrations, models
+
+# Frozen copies of content.icons as of this migration, so later edits there
+# can't change what it does
+REMOVE_RES = [
+    re.compile(r'<\?xml.*?\?>', re.S),
+    re.compile(r'<!DOCTYPE[^>]*>', re.S | re.I),
+    re.compile(r'<!--.*?-->', re.S),
+    re.compile(r'<(metadata|script|sodipodi:namedview)\b.*?</\1\s*>', re.S | re.I),
+    re.compile(r'<(sodipodi:namedview|script)\b[^>]*/>', re.S | re.I),
+    re.compile(r'\s(?:xmlns:(?:sodipodi|inkscape)|sodipodi:[\w-]+|inkscape:[\w-]+|on\w+)\s*=\s*(?:"[^"]*"|\'[^\']*\')', re.I),
+]
+BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+WHITESPACE_RE = re.compile(r'\s+')
+TAG_SPACE_RE = re.compile(r'\s*(/?>)')
+
+
+def minify_svg(svg):
+    if not svg:
+        return svg
+    for pattern in REMOVE_RES:
+        svg = pattern.sub('', svg)
+    svg = BETWEEN_TAGS_RE.sub('><', svg.strip())
+    svg = WHITESPACE_RE.sub(' ', svg)
+    return TAG_SPACE_RE.sub(r'\1', svg)
+
+
+def icon_digest(svg):
+    return hashlib.sha256(svg.encode()).hexdigest()[:16]
+
+
+def register_existing_icons(apps, schema_editor):
+    SvgIcon = apps.get_model('content', 'SvgIcon')
+    for name in ('Service', 'WhyChooseUsFeature', 'WorkingProcessStep', 'ContactInfo'):
+        model = apps.get_model('content', name)
+        for row in model.objects.only('id', 'icon_svg'):
+            row.icon_svg = minify_svg(row.icon_svg)
+            row.icon_id = icon_digest(row.icon_svg) if row.icon_svg else ''
+            if row.icon_id:
+                SvgIcon.objects.get_or_create(id=row.icon_id, defaults={'svg': row.icon_svg})
+            row.save(update_fields=['icon_svg', 'icon_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0030_blogpost_rendered_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SvgIcon',
+            fields=[
+                ('id', models.CharField(max_length=16, primary_key=True, serialize=False)),
+                ('svg', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contactinfo',
+            name='icon_id',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='icon_id',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='whychooseusfeature',
+            name='icon_id',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='workingprocessstep',
+            name='icon_id',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(register_existing_icons, migrations.RunPython.noop),
+    ]
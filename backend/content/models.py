@@ -1,11 +1,61 @@
 from django.db import models
 from ckeditor.fields import RichTextField
+from .richtext import render_rich_text
 
 
-class SiteSettings(models.Model):
+class SingletonModel(models.Model):
+    """Base for the one-row settings and section models."""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def load(cls):
+        """Return the row from the per-process singleton cache, or None.
+
+        The instance is shared by every request in the worker: treat it as read-only.
+        """
+        from .singletons import load_singleton
+        return load_singleton(cls)
+
+    @classmethod
+    def get_for_update(cls):
+        """Return a fresh, editable copy of the row, creating it if needed."""
+        return cls.objects.order_by('pk').first() or cls.objects.create()
+
+
+class IconSvgModel(models.Model):
+    """Base for models with an ``icon_svg``: minified and registered in SvgIcon on save."""
+    icon_id = models.CharField(max_length=16, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'icon_svg' in update_fields:
+            from .icons import register_icon
+            self.icon_svg, self.icon_id = register_icon(self.icon_svg)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'icon_id'}
+        super().save(*args, **kwargs)
+
+
+class SvgIcon(models.Model):
+    """Registry of distinct minified icons, keyed by a hash of the markup."""
+    id = models.CharField(max_length=16, primary_key=True)
+    svg = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.id
+
+
+class SiteSettings(SingletonModel):
     site_name = models.CharField(max_length=100, default="Inno8 Solutions")
     logo = models.ImageField(upload_to='logos/', null=True, blank=True)
     mobile_logo = models.ImageField(upload_to='logos/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     email = models.EmailField(default="info.inno8sh@gmail.com")
     phone = models.CharField(max_length=20, default="+93 711 167 380")
     address = models.CharField(max_length=200, default="Kabul, Afghanistan")
@@ -50,6 +100,7 @@ class HeroSection(models.Model):
     button_text = models.CharField(max_length=50, default="Get Started")
     button_url = models.CharField(max_length=200, default="/contact")
     background_image = models.ImageField(upload_to='hero/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     
@@ -58,12 +109,13 @@ class HeroSection(models.Model):
         verbose_name = "Hero Section"
         verbose_name_plural = "Hero Sections"
     
-class Service(models.Model):
+class Service(IconSvgModel):
     name = models.CharField(max_length=100)
     description = models.TextField()
     icon = models.CharField(max_length=50, null=True, blank=True)
     icon_svg = models.TextField(null=True, blank=True, help_text="Custom SVG icon code")
     image = models.ImageField(upload_to='services/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     
@@ -76,6 +128,7 @@ class Testimonial(models.Model):
     company = models.CharField(max_length=100)
     content = models.TextField()
     image = models.ImageField(upload_to='testimonials/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     rating = models.IntegerField(default=5)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
@@ -83,7 +136,7 @@ class Testimonial(models.Model):
     class Meta:
         ordering = ['order']
 
-class TestimonialsSection(models.Model):
+class TestimonialsSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="Client Testimonials")
     title = models.CharField(max_length=200, default="What Our Clients Say")
     description = models.TextField(default="Don't just take our word for it. Here's what our satisfied clients have to say about our services.")
@@ -96,6 +149,7 @@ class Project(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     image = models.ImageField(upload_to='projects/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     url = models.URLField(null=True, blank=True)
     learn_more_url = models.URLField(null=True, blank=True)
     live_preview_url = models.URLField(null=True, blank=True)
@@ -104,7 +158,7 @@ class Project(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
-class AboutSection(models.Model):
+class AboutSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="About Your Company")
     title = models.CharField(max_length=200, default="We Execute Ideas\nFrom Start to Finish")
     button_text = models.CharField(max_length=50, default="Know More")
@@ -121,13 +175,14 @@ class AboutSection(models.Model):
     vision_description = models.TextField(default="To become the leading software house that transforms businesses through innovative digital solutions and exceptional user experiences.")
     image1 = models.ImageField(upload_to='about/', null=True, blank=True)
     image2 = models.ImageField(upload_to='about/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     floating_text = models.TextField(default="Repellendus autem ruibusdam at aut officiis debitis aut re necessitatibus saepe eveniet ut et repudianda sint et molestiae non recusandae.")
     
     class Meta:
         verbose_name = "About Section"
         verbose_name_plural = "About Section"
 
-class ServicesSection(models.Model):
+class ServicesSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="OUR OFFERING")
     title = models.CharField(max_length=200, default="Enhance And Pioneer Using")
     title_highlight = models.CharField(max_length=100, default="Technology Trends")
@@ -137,7 +192,7 @@ class ServicesSection(models.Model):
         verbose_name = "Services Section"
         verbose_name_plural = "Services Section"
 
-class WhyChooseUsFeature(models.Model):
+class WhyChooseUsFeature(IconSvgModel):
     title = models.CharField(max_length=100)
     description = models.TextField()
     icon_svg = models.TextField(help_text="SVG icon code")
@@ -152,7 +207,7 @@ class WhyChooseUsFeature(models.Model):
     def __str__(self):
         return self.title
 
-class WhyChooseUsSection(models.Model):
+class WhyChooseUsSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="OUR STRENGTHS")
     title = models.CharField(max_length=200, default="WHY CHOOSE INNO8")
     breadcrumb_items = models.CharField(max_length=200, default="Experience,Innovation,Results", help_text="Comma separated items")
@@ -164,6 +219,7 @@ class WhyChooseUsSection(models.Model):
 class ClientLogo(models.Model):
     name = models.CharField(max_length=100)
     logo = models.ImageField(upload_to='clients/')
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     
@@ -175,7 +231,7 @@ class ClientLogo(models.Model):
     def __str__(self):
         return self.name
 
-class WorkingProcessStep(models.Model):
+class WorkingProcessStep(IconSvgModel):
     number = models.CharField(max_length=10, default="01")
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -191,7 +247,7 @@ class WorkingProcessStep(models.Model):
     def __str__(self):
         return f"{self.number} - {self.title}"
 
-class WorkingProcessSection(models.Model):
+class WorkingProcessSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="How We Work")
     title = models.CharField(max_length=200, default="Our Working Process")
     description = models.TextField(default="We follow a proven methodology to deliver exceptional results for every project")
@@ -200,7 +256,7 @@ class WorkingProcessSection(models.Model):
         verbose_name = "Working Process Section"
         verbose_name_plural = "Working Process Section"
 
-class ContactInfo(models.Model):
+class ContactInfo(IconSvgModel):
     title = models.CharField(max_length=100)
     value = models.CharField(max_length=200)
     icon_svg = models.TextField(help_text="SVG icon code")
@@ -215,7 +271,7 @@ class ContactInfo(models.Model):
     def __str__(self):
         return self.title
 
-class ContactSection(models.Model):
+class ContactSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="Get In Touch")
     title = models.CharField(max_length=200, default="Contact Us")
     description = models.TextField(default="Ready to transform your ideas into reality? Let's build something amazing together.")
@@ -228,7 +284,13 @@ class BlogPost(models.Model):
     title = models.CharField(max_length=200)
     excerpt = models.TextField(max_length=300)
     content = RichTextField()
+    # Derived from content on save (content/richtext.py)
+    content_html = models.TextField(blank=True, editable=False)
+    content_toc = models.JSONField(default=list, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
     image = models.ImageField(upload_to='blogs/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     author = models.CharField(max_length=100, default="Inno8 Team")
     category = models.CharField(max_length=50, default="DEVELOPMENT")
     date_published = models.DateTimeField(auto_now_add=True)
@@ -240,11 +302,27 @@ class BlogPost(models.Model):
         ordering = ['-date_published']
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
+        indexes = [
+            models.Index(fields=['date_published', 'id'], name='content_blog_date_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
 
-class BlogsSection(models.Model):
+    def save(self, *args, **kwargs):
+        # Render once per edit so views serve the processed HTML as stored
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.content_html, self.content_toc, self.word_count, self.reading_time = (
+                render_rich_text(self.content)
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'content_html', 'content_toc', 'word_count', 'reading_time',
+                }
+        super().save(*args, **kwargs)
+
+class BlogsSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="Latest News")
     title = models.CharField(max_length=200, default="Our Blog")
     description = models.TextField(default="Stay updated with our latest insights, tips, and industry news.")
@@ -257,6 +335,7 @@ class TeamMember(models.Model):
     name = models.CharField(max_length=100)
     position = models.CharField(max_length=100)
     image = models.ImageField(upload_to='team/')
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     rss_url = models.URLField(null=True, blank=True)
     pinterest_url = models.URLField(null=True, blank=True)
     google_plus_url = models.URLField(null=True, blank=True)
@@ -273,7 +352,7 @@ class TeamMember(models.Model):
     def __str__(self):
         return f"{self.name} - {self.position}"
 
-class TeamSection(models.Model):
+class TeamSection(SingletonModel):
     subtitle = models.CharField(max_length=100, default="OUR PROFESSIONAL")
     title = models.CharField(max_length=200, default="Meet Our Experts People")
     
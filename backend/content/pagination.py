@@ -0,0 +1,39 @@
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(post):
+    raw = f'{post.date_published.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (date_published, pk) from a cursor, raising ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_str, pk = raw.rsplit('|', 1)
+        date_published = parse_datetime(date_str)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if date_published is None:
+        raise ValueError('Invalid cursor')
+    return date_published, pk
+
+
+def keyset_page(queryset, cursor, page_size):
+    """Newest-first page of ``queryset`` after ``cursor``, keyed on (date_published, id).
+
+    Seeks straight to the cursor position instead of counting an offset, so
+    every page costs the same however deep into the archive it is. Returns
+    ``(items, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    queryset = queryset.order_by('-date_published', '-id')
+    if cursor:
+        date_published, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(date_published__lt=date_published) | Q(date_published=date_published, id__lt=pk))
+    items = list(queryset[:page_size + 1])
+    if len(items) > page_size:
+        return items[:page_size], encode_cursor(items[page_size - 1])
+    return items, None
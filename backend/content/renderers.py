@@ -0,0 +1,50 @@
+"""JSON renderer backed by orjson, byte-for-byte compatible with DRF's JSONRenderer.
+
+Types orjson doesn't handle the way DRF does (datetimes, dates, times,
+Decimals, lazy strings, querysets, ...) go through DRF's own encoder, so
+``'2026-01-01T10:00:00.123Z'`` style output is unchanged. Indented output
+(``?indent``/``Accept: application/json; indent=4``) and anything orjson
+rejects, such as integers beyond 64 bits, are rendered by the stock renderer.
+Without orjson installed this is the stock renderer.
+
+Set per view with ``@renderer_classes([ORJSONRenderer])`` or ``renderer_classes``
+on a viewset; the project default is configured in ``REST_FRAMEWORK``.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is used without it
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def use_orjson(self, accepted_media_type, renderer_context):
+        # orjson only writes compact UTF-8, the stock defaults
+        return (
+            orjson is not None
+            and not self.get_indent(accepted_media_type, renderer_context or {})
+            and api_settings.COMPACT_JSON and api_settings.UNICODE_JSON
+            and self.encoder_class is JSONEncoder
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.use_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same as the stock renderer: keep the output valid inside <script>
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
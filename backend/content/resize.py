@@ -0,0 +1,191 @@
+"""On-the-fly resizing of files under MEDIA_ROOT with a bounded disk cache.
+
+Transformed images are stored under IMAGE_RESIZE_CACHE_DIR by the SHA-256 of
+the source bytes plus the transform, so the same upload at two paths shares
+one entry and a replaced file never serves a stale one. Each hit bumps the
+entry's mtime; once the cache outgrows IMAGE_RESIZE_CACHE_MAX_BYTES the least
+recently used entries are removed. With IMAGE_RESIZE_ACCEL_PREFIX set, hits
+are handed to nginx instead of being streamed by Django::
+
+    location /media/resize/ { proxy_pass http://django; }
+    location /_resized/ {
+        internal;
+        alias /path/to/IMAGE_RESIZE_CACHE_DIR/;
+        expires 1d;
+    }
+"""
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from PIL import Image, features
+from .images import encode_image, prepare_image, resize_to_width
+
+CONTENT_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def output_formats():
+    """The formats of CONTENT_TYPES this Pillow can encode; AVIF and WebP depend on its build."""
+    return tuple(fmt for fmt in CONTENT_TYPES if fmt in ('jpeg', 'png') or features.check(fmt))
+
+
+def snap(value, steps):
+    """The smallest of ``steps`` that is at least ``value``, or the largest."""
+    return next((step for step in steps if step >= value), steps[-1])
+
+
+# Don't rewrite an entry's mtime more often than this on hits
+TOUCH_INTERVAL = 60
+
+# (path, size, mtime_ns) -> sha256 of the file, so sources are hashed once per change
+_digests = {}
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+_cache_size = None
+_cache_size_lock = threading.Lock()
+
+
+def cache_dir():
+    return Path(settings.IMAGE_RESIZE_CACHE_DIR)
+
+
+def source_digest(path):
+    stat = path.stat()
+    signature = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(signature)
+    if digest is None:
+        if len(_digests) > 10000:
+            _digests.clear()
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        digest = _digests[signature] = sha.hexdigest()
+    return digest
+
+
+def cache_key(digest, width, fmt, quality):
+    return hashlib.sha256(f'{digest}|{width}|{fmt}|{quality}'.encode()).hexdigest()
+
+
+def entry_path(key, fmt):
+    return cache_dir() / key[:2] / f'{key}.{fmt}'
+
+
+def _lock_for(key):
+    with _key_locks_lock:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = [threading.Lock(), 0]
+        lock[1] += 1
+        return lock
+
+
+def _release(key, lock):
+    with _key_locks_lock:
+        lock[1] -= 1
+        if not lock[1]:
+            del _key_locks[key]
+
+
+def _touch(path):
+    try:
+        if time.time() - path.stat().st_mtime > TOUCH_INTERVAL:
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _scan():
+    entries = []
+    for path in cache_dir().glob('*/*'):
+        if path.name.startswith('.'):  # in-flight temp files
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def _record_write(size, keep):
+    """Account for a new entry and evict the least recently used ones if over budget."""
+    global _cache_size
+    with _cache_size_lock:
+        if _cache_size is None:
+            _cache_size = sum(size for mtime, size, path in _scan())
+        else:
+            _cache_size += size
+        if _cache_size <= settings.IMAGE_RESIZE_CACHE_MAX_BYTES:
+            return
+        # Other workers write too, so rescan instead of trusting the running total
+        entries = sorted(_scan())
+        total = sum(size for mtime, size, path in entries)
+        target = settings.IMAGE_RESIZE_CACHE_MAX_BYTES * 0.9
+        for mtime, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        _cache_size = total
+
+
+def _transform(source, destination, width, fmt, quality):
+    """Write the transformed image to ``destination`` and return it opened."""
+    with Image.open(source) as image:
+        data = encode_image(resize_to_width(prepare_image(image), width), fmt, quality)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix='.resize-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    f = open(destination, 'rb')
+    _record_write(len(data), keep=destination)
+    return f
+
+
+def open_resized(source, width, fmt, quality):
+    """Return ``(cache key, path, open file)`` of ``source`` transformed, producing it on a miss.
+
+    The file is opened before returning so a concurrent eviction can't pull it
+    out from under the response. Concurrent requests for the same transform in
+    this process wait for the first one instead of repeating it.
+    """
+    key = cache_key(source_digest(source), width, fmt, quality)
+    path = entry_path(key, fmt)
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        lock = _lock_for(key)
+        try:
+            with lock[0]:
+                try:
+                    f = open(path, 'rb')
+                except FileNotFoundError:
+                    f = _transform(source, path, width, fmt, quality)
+        finally:
+            _release(key, lock)
+    else:
+        _touch(path)
+    return key, path, f
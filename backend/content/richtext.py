@@ -0,0 +1,197 @@
+"""Save-time rendering of CKEditor HTML for public display.
+
+``render_rich_text`` sanitizes against an allowlist, collapses whitespace,
+marks images ``loading="lazy" decoding="async"``, gives headings stable ids
+and collects them into a table of contents, and counts words. BlogPost stores
+the result so the work happens once per edit rather than on every view.
+"""
+import html
+import math
+import re
+from html.parser import HTMLParser
+from django.utils.text import slugify
+
+WORDS_PER_MINUTE = 200
+TOC_LEVELS = ('h2', 'h3', 'h4')
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'b', 'em', 'i', 'u',
+    's', 'strike', 'sub', 'sup', 'small', 'mark', 'blockquote', 'pre', 'code', 'ul', 'ol',
+    'li', 'dl', 'dt', 'dd', 'a', 'img', 'figure', 'figcaption', 'table', 'caption',
+    'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'span', 'div', 'iframe',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'iframe': {'src', 'title', 'width', 'height', 'allowfullscreen'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'ol': {'start', 'type'},
+}
+# Dropped together with everything inside them
+DROP_CONTENT = {'script', 'style', 'noscript', 'template', 'object', 'svg', 'math', 'title'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Whitespace between these is insignificant and removed
+BLOCK_TAGS = {
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'ul', 'ol', 'li', 'dl',
+    'dt', 'dd', 'figure', 'figcaption', 'table', 'caption', 'thead', 'tbody', 'tfoot',
+    'tr', 'th', 'td', 'div', 'hr', 'br',
+}
+URL_SCHEMES = ('http://', 'https://', 'mailto:', 'tel:')
+EMBED_PREFIXES = ('https://www.youtube.com/embed/', 'https://www.youtube-nocookie.com/embed/', 'https://player.vimeo.com/video/')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+(?:[\'’-]\w+)*', re.UNICODE)
+
+
+def _safe_url(value, tag):
+    value = (value or '').strip()
+    if tag == 'iframe':
+        return value if value.startswith(EMBED_PREFIXES) else None
+    lowered = value.lower()
+    if lowered.startswith(URL_SCHEMES) or value.startswith(('/', '#', '?')):
+        return value
+    # Relative paths, but nothing with a scheme (javascript:, data:, ...)
+    if ':' not in value.split('/', 1)[0]:
+        return value
+    return None
+
+
+class _RichTextRenderer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.stack = []
+        # Open elements whose content is being discarded
+        self.dropping = []
+        self.in_pre = 0
+        self.words = 0
+        self.toc = []
+        self.heading = None
+        self.slugs = set()
+        # Whitespace right after a block tag opens or closes carries no meaning
+        self.after_block = True
+
+    def _attrs(self, tag, attrs):
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        cleaned = []
+        for name, value in attrs:
+            if name not in allowed:
+                continue
+            if name in ('href', 'src'):
+                value = _safe_url(value, tag)
+                if value is None:
+                    continue
+            cleaned.append((name, value))
+        if tag == 'a' and any(name == 'target' for name, value in cleaned):
+            cleaned.append(('rel', 'noopener noreferrer'))
+        if tag in ('img', 'iframe'):
+            cleaned += [('loading', 'lazy')] + ([('decoding', 'async')] if tag == 'img' else [])
+        return cleaned
+
+    def _emit_start(self, tag, attrs):
+        parts = [tag]
+        for name, value in attrs:
+            parts.append(name if value is None else f'{name}="{html.escape(value)}"')
+        self.out.append(f'<{" ".join(parts)}>')
+        self.after_block = tag in BLOCK_TAGS
+
+    def handle_starttag(self, tag, attrs):
+        if self.dropping or tag in DROP_CONTENT:
+            if tag in DROP_CONTENT or tag == self.dropping[-1]:
+                self.dropping.append(tag)
+            return
+        if tag not in ALLOWED_TAGS:
+            return  # unwrap: keep the text, lose the tag
+        attrs = self._attrs(tag, attrs)
+        if tag in ('img', 'iframe') and not any(name == 'src' for name, value in attrs):
+            if tag == 'iframe':
+                self.dropping.append(tag)
+            return
+        if tag in VOID_TAGS:
+            self._emit_start(tag, attrs)
+            return
+        if tag in TOC_LEVELS and self.heading is None:
+            # The id is filled in at the end tag, once the heading text is known
+            self.heading = {'level': int(tag[1]), 'text': [], 'index': len(self.out), 'attrs': attrs}
+            self.out.append(None)
+            self.after_block = True
+        else:
+            self._emit_start(tag, attrs)
+        if tag == 'pre':
+            self.in_pre += 1
+        self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and tag in self.stack and self.stack[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropping:
+            if tag == self.dropping[-1]:
+                self.dropping.pop()
+            return
+        if tag not in self.stack:
+            return
+        # Close anything left open inside this element
+        while self.stack:
+            open_tag = self.stack.pop()
+            self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        if tag == 'pre':
+            self.in_pre -= 1
+        if self.heading is not None and tag == f'h{self.heading["level"]}':
+            text = _WHITESPACE_RE.sub(' ', ''.join(self.heading['text'])).strip()
+            slug = base = slugify(text) or 'section'
+            counter = 2
+            while slug in self.slugs:
+                slug = f'{base}-{counter}'
+                counter += 1
+            self.slugs.add(slug)
+            attrs = [('id', slug)] + self.heading['attrs']
+            self.out[self.heading['index']] = '<{}>'.format(
+                ' '.join([tag] + [f'{name}="{html.escape(value)}"' for name, value in attrs])
+            )
+            if text:
+                self.toc.append({'level': self.heading['level'], 'text': text, 'id': slug})
+            self.heading = None
+        self.out.append(f'</{tag}>')
+        self.after_block = tag in BLOCK_TAGS
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        if not self.in_pre:
+            data = _WHITESPACE_RE.sub(' ', data)
+            if self.after_block:
+                data = data.lstrip()
+                if not data:
+                    return
+        self.after_block = False
+        self.words += len(_WORD_RE.findall(data))
+        if self.heading is not None:
+            self.heading['text'].append(data)
+        self.out.append(html.escape(data, quote=False))
+
+    def result(self):
+        while self.stack:
+            self._close(self.stack.pop())
+        return ''.join(part for part in self.out if part is not None).strip()
+
+
+def render_rich_text(value):
+    """Return ``(html, toc, word_count, reading_time)`` for CKEditor HTML.
+
+    ``toc`` lists the h2-h4 headings as ``{'level', 'text', 'id'}``, matching
+    the ids added to the headings in ``html``; ``reading_time`` is in minutes.
+    """
+    renderer = _RichTextRenderer()
+    renderer.feed(value or '')
+    renderer.close()
+    words = renderer.words
+    reading_time = math.ceil(words / WORDS_PER_MINUTE) if words else 0
+    return renderer.result(), renderer.toc, words, reading_time
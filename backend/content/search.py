@@ -0,0 +1,170 @@
+"""Full-text search over blog posts, projects, services and FAQs (SQLite FTS5)."""
+import html
+import re
+from html.parser import HTMLParser
+from django.db import connection
+from .models import BlogPost, FAQ, Project, Service
+
+SEARCH_TABLE = 'content_search'
+
+CREATE_SEARCH_TABLE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+# Title matches weigh ten times more than body matches in the BM25 rank
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+MAX_TERMS = 10
+
+# Private-use markers survive html.escape(), then become <mark> tags
+_MARK_START = '\ue000'
+_MARK_END = '\ue001'
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class _TextExtractor(HTMLParser):
+    SKIP = {'script', 'style'}
+    BLOCK = {'p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'blockquote'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skipping += 1
+        elif tag in self.BLOCK:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skipping:
+            self.skipping -= 1
+        elif tag in self.BLOCK:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def strip_html(value):
+    """Plain text of CKEditor HTML, with entities decoded and whitespace collapsed."""
+    extractor = _TextExtractor()
+    extractor.feed(value or '')
+    extractor.close()
+    return ' '.join(''.join(extractor.parts).split())
+
+
+def _blog_document(post):
+    return post.title, f'{post.excerpt}\n{strip_html(post.content)}'
+
+def _project_document(project):
+    return project.title, f'{project.description}\n{project.technologies}'
+
+def _service_document(service):
+    return service.name, service.description
+
+def _faq_document(faq):
+    return faq.question, faq.answer
+
+
+# kind -> (model, document builder)
+SEARCH_MODELS = {
+    'blog': (BlogPost, _blog_document),
+    'project': (Project, _project_document),
+    'service': (Service, _service_document),
+    'faq': (FAQ, _faq_document),
+}
+KIND_FOR_MODEL = {model: kind for kind, (model, builder) in SEARCH_MODELS.items()}
+
+
+def index_instance(instance):
+    kind = KIND_FOR_MODEL[type(instance)]
+    builder = SEARCH_MODELS[kind][1]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id = %s', [kind, instance.pk])
+        if instance.is_active:
+            title, body = builder(instance)
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)',
+                [kind, instance.pk, title, body],
+            )
+
+
+def remove_instance(instance):
+    kind = KIND_FOR_MODEL[type(instance)]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id = %s', [kind, instance.pk])
+
+
+def rebuild_index():
+    """Re-index every active searchable row. Returns the number of documents."""
+    rows = []
+    for kind, (model, builder) in SEARCH_MODELS.items():
+        for instance in model.objects.filter(is_active=True).iterator():
+            rows.append((kind, instance.pk) + builder(instance))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)', rows
+        )
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+    return len(rows)
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 query: every term must match, as a prefix.
+
+    Terms are quoted, so FTS5 operators typed by users are matched literally
+    instead of raising syntax errors.
+    """
+    terms = _TERM_RE.findall(query.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _highlighted(value):
+    return html.escape(value).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_sql(kinds=None):
+    kind_filter = ''
+    if kinds:
+        kind_filter = 'AND kind IN (%s)' % ', '.join(['%s'] * len(kinds))
+    return f"""
+        SELECT kind, object_id,
+               highlight({SEARCH_TABLE}, 2, %s, %s),
+               snippet({SEARCH_TABLE}, 3, %s, %s, '…', 16),
+               bm25({SEARCH_TABLE}, 0, 0, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank
+        FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH %s {kind_filter}
+        ORDER BY rank
+        LIMIT %s
+    """
+
+
+def search(query, kinds=None, limit=20):
+    """Return ranked hits as dicts with highlighted ``title`` and ``snippet`` HTML."""
+    match = build_match_query(query)
+    if not match:
+        return []
+    params = [_MARK_START, _MARK_END, _MARK_START, _MARK_END, match] + list(kinds or []) + [limit]
+    with connection.cursor() as cursor:
+        cursor.execute(search_sql(kinds), params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': kind,
+            'id': int(object_id),
+            'title': _highlighted(title),
+            'snippet': _highlighted(snippet),
+            'score': round(-rank, 4),
+        }
+        for kind, object_id, title, snippet, rank in rows
+    ]
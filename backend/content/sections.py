@@ -0,0 +1,143 @@
+from .models import *
+from .serializers import *
+from .menu import menu_tree
+from .fastserializers import row_serializer
+
+DEFAULT_COLOR_PALETTE = {
+    'primary_color': '#0477BF',
+    'secondary_color': '#012340',
+    'accent_color': '#FCB316',
+    'light_color': '#048ABF'
+}
+
+
+def _serialize_one(serializer_class, instance):
+    fast = row_serializer(serializer_class)
+    return fast.from_instance(instance) if fast else serializer_class(instance).data
+
+
+def _serialize_many(serializer_class, queryset):
+    fast = row_serializer(serializer_class)
+    return fast.many(fast.rows(queryset)) if fast else serializer_class(queryset, many=True).data
+
+
+def _single(model, serializer_class):
+    instance = model.load()
+    if instance:
+        return _serialize_one(serializer_class, instance)
+    return {}
+
+
+def _active(model, serializer_class, ordering='order'):
+    items = model.objects.filter(is_active=True).order_by(ordering)
+    return _serialize_many(serializer_class, items)
+
+
+def site_settings():
+    return _single(SiteSettings, SiteSettingsSerializer)
+
+def menu_items():
+    return menu_tree()
+
+def hero_sections():
+    return _active(HeroSection, HeroSectionSerializer)
+
+def color_palette():
+    palette = ColorPalette.objects.filter(is_active=True).first()
+    if palette:
+        return _serialize_one(ColorPaletteSerializer, palette)
+    return dict(DEFAULT_COLOR_PALETTE)
+
+def about_section():
+    return _single(AboutSection, AboutSectionSerializer)
+
+def services_section():
+    return _single(ServicesSection, ServicesSectionSerializer)
+
+def services():
+    return _active(Service, ServiceSerializer)
+
+def projects():
+    return _active(Project, ProjectSerializer, ordering='-created_at')
+
+def why_choose_us():
+    return _active(WhyChooseUsFeature, WhyChooseUsFeatureSerializer)
+
+def why_choose_us_section():
+    return _single(WhyChooseUsSection, WhyChooseUsSectionSerializer)
+
+def working_process():
+    return _active(WorkingProcessStep, WorkingProcessStepSerializer)
+
+def working_process_section():
+    return _single(WorkingProcessSection, WorkingProcessSectionSerializer)
+
+def client_logos():
+    return _active(ClientLogo, ClientLogoSerializer)
+
+def testimonials():
+    return _active(Testimonial, TestimonialSerializer)
+
+def testimonials_section():
+    return _single(TestimonialsSection, TestimonialsSectionSerializer)
+
+def contact_info():
+    return _active(ContactInfo, ContactInfoSerializer)
+
+def contact_section():
+    return _single(ContactSection, ContactSectionSerializer)
+
+def blog_posts():
+    posts = BlogPost.objects.filter(is_active=True).order_by('-date_published', '-id')[:6]
+    return _serialize_many(BlogPostSerializer, posts)
+
+def blogs_section():
+    return _single(BlogsSection, BlogsSectionSerializer)
+
+def team_members():
+    return _active(TeamMember, TeamMemberSerializer)
+
+def team_section():
+    return _single(TeamSection, TeamSectionSerializer)
+
+def faqs():
+    return _active(FAQ, FAQSerializer)
+
+
+# Section name -> (builder, models whose rows end up in the payload)
+SECTIONS = {
+    'site_settings': (site_settings, (SiteSettings,)),
+    'menu_items': (menu_items, (MenuItem,)),
+    'hero_sections': (hero_sections, (HeroSection,)),
+    'color_palette': (color_palette, (ColorPalette,)),
+    'about_section': (about_section, (AboutSection,)),
+    'services_section': (services_section, (ServicesSection,)),
+    'services': (services, (Service,)),
+    'projects': (projects, (Project,)),
+    'why_choose_us': (why_choose_us, (WhyChooseUsFeature,)),
+    'why_choose_us_section': (why_choose_us_section, (WhyChooseUsSection,)),
+    'working_process': (working_process, (WorkingProcessStep,)),
+    'working_process_section': (working_process_section, (WorkingProcessSection,)),
+    'client_logos': (client_logos, (ClientLogo,)),
+    'testimonials': (testimonials, (Testimonial,)),
+    'testimonials_section': (testimonials_section, (TestimonialsSection,)),
+    'contact_info': (contact_info, (ContactInfo,)),
+    'contact_section': (contact_section, (ContactSection,)),
+    'blog_posts': (blog_posts, (BlogPost,)),
+    'blogs_section': (blogs_section, (BlogsSection,)),
+    'team_members': (team_members, (TeamMember,)),
+    'team_section': (team_section, (TeamSection,)),
+    'faqs': (faqs, (FAQ,)),
+}
+
+
+def build_section(name):
+    builder, models = SECTIONS[name]
+    return builder()
+
+
+def section_models(names):
+    models = set()
+    for name in names:
+        models.update(SECTIONS[name][1])
+    return models
@@ -1,12 +1,40 @@
+from django.core.files.storage import default_storage
+from django.conf import settings
 from rest_framework import serializers
 from .models import *
+from .sparse import SparseFieldsetSerializer
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """``image_meta`` per image field: srcset-ready URL maps plus placeholder data.
+
+    ``{field: {'width', 'height', 'color', 'lqip', 'webp': {width: url}, 'avif': {...}}}``
+    """
+
+    def to_representation(self, meta):
+        request = self.context.get('request')
+
+        def to_url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+
+        variants = {}
+        for field, entry in (meta or {}).items():
+            variants[field] = {
+                key: {width: to_url(name) for width, name in value.items()} if isinstance(value, dict) else value
+                for key, value in entry.items() if key not in ('source', 'version')
+            }
+        return variants
+
+
+class SiteSettingsSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
 
-class SiteSettingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = SiteSettings
-        fields = '__all__'
+        exclude = ['image_meta']
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(SparseFieldsetSerializer):
     children = serializers.SerializerMethodField()
     
     class Meta:
@@ -14,127 +42,163 @@ class MenuItemSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_children(self, obj):
-        children = MenuItem.objects.filter(parent=obj, is_active=True)
-        return MenuItemSerializer(children, many=True).data
+        # menu.menu_tree() passes the whole tree so nested levels need no queries
+        menu_children = self.context.get('menu_children')
+        if menu_children is not None:
+            children = menu_children.get(obj.id, [])
+        else:
+            children = MenuItem.objects.filter(parent=obj, is_active=True)
+        return MenuItemSerializer(children, many=True, context=self.context).data
 
-class ColorPaletteSerializer(serializers.ModelSerializer):
+class ColorPaletteSerializer(SparseFieldsetSerializer):
     class Meta:
         model = ColorPalette
         fields = '__all__'
 
-class HeroSectionSerializer(serializers.ModelSerializer):
+class HeroSectionSerializer(SparseFieldsetSerializer):
     backgroundImage = serializers.SerializerMethodField()
     buttonText = serializers.CharField(source='button_text')
-    
+    image_variants = ImageVariantsField(source='image_meta')
+
     class Meta:
         model = HeroSection
-        fields = ['id', 'title', 'subtitle', 'description', 'buttonText', 'backgroundImage', 'background_image', 'order', 'is_active']
+        fields = ['id', 'title', 'subtitle', 'description', 'buttonText', 'backgroundImage', 'background_image', 'image_variants', 'order', 'is_active']
     
     def get_backgroundImage(self, obj):
         if obj.background_image:
             request = self.context.get('request')
             if request:
                 return request.build_absolute_uri(obj.background_image.url)
-            return f"http://localhost:8010{obj.background_image.url}"
+            return f"{settings.MEDIA_BASE_URL}{obj.background_image.url}"
         return None
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
+
     class Meta:
         model = Service
-        fields = '__all__'
+        exclude = ['image_meta']
+
+class TestimonialSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
 
-class TestimonialSerializer(serializers.ModelSerializer):
     class Meta:
         model = Testimonial
-        fields = '__all__'
+        exclude = ['image_meta']
 
-class TestimonialsSectionSerializer(serializers.ModelSerializer):
+class TestimonialsSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = TestimonialsSection
         fields = '__all__'
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
+
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = ['image_meta']
+
+class AboutSectionSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
 
-class AboutSectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = AboutSection
-        fields = '__all__'
+        exclude = ['image_meta']
 
-class ServicesSectionSerializer(serializers.ModelSerializer):
+class ServicesSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = ServicesSection
         fields = '__all__'
 
-class WhyChooseUsFeatureSerializer(serializers.ModelSerializer):
+class WhyChooseUsFeatureSerializer(SparseFieldsetSerializer):
     class Meta:
         model = WhyChooseUsFeature
         fields = '__all__'
 
-class WhyChooseUsSectionSerializer(serializers.ModelSerializer):
+class WhyChooseUsSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = WhyChooseUsSection
         fields = '__all__'
 
-class ClientLogoSerializer(serializers.ModelSerializer):
+class ClientLogoSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
+
     class Meta:
         model = ClientLogo
-        fields = '__all__'
+        exclude = ['image_meta']
 
-class WorkingProcessStepSerializer(serializers.ModelSerializer):
+class WorkingProcessStepSerializer(SparseFieldsetSerializer):
     class Meta:
         model = WorkingProcessStep
         fields = '__all__'
 
-class WorkingProcessSectionSerializer(serializers.ModelSerializer):
+class WorkingProcessSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = WorkingProcessSection
         fields = '__all__'
 
-class ContactInfoSerializer(serializers.ModelSerializer):
+class ContactInfoSerializer(SparseFieldsetSerializer):
     class Meta:
         model = ContactInfo
         fields = '__all__'
 
-class ContactSectionSerializer(serializers.ModelSerializer):
+class ContactSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = ContactSection
         fields = '__all__'
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
+
     class Meta:
         model = BlogPost
-        fields = '__all__'
+        exclude = ['image_meta', 'content_html', 'content_toc']
+
+class BlogPostDetailSerializer(SparseFieldsetSerializer):
+    """Public detail: the pre-rendered HTML replaces the raw CKEditor content."""
+    image_variants = ImageVariantsField(source='image_meta')
+    toc = serializers.JSONField(source='content_toc', read_only=True)
+
+    class Meta:
+        model = BlogPost
+        exclude = ['image_meta', 'content', 'content_toc']
+
+class BlogPostCardSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
+
+    class Meta:
+        model = BlogPost
+        fields = ['id', 'title', 'excerpt', 'image', 'image_variants', 'category', 'slug', 'date_published']
 
-class BlogsSectionSerializer(serializers.ModelSerializer):
+class BlogsSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = BlogsSection
         fields = '__all__'
 
-class TeamMemberSerializer(serializers.ModelSerializer):
+class TeamMemberSerializer(SparseFieldsetSerializer):
+    image_variants = ImageVariantsField(source='image_meta')
+
     class Meta:
         model = TeamMember
-        fields = '__all__'
+        exclude = ['image_meta']
 
-class TeamSectionSerializer(serializers.ModelSerializer):
+class TeamSectionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = TeamSection
         fields = '__all__'
 
-class ContactSubmissionSerializer(serializers.ModelSerializer):
+class ContactSubmissionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = ContactSubmission
         fields = '__all__'
         read_only_fields = ['submitted_at']
 
-class FAQSerializer(serializers.ModelSerializer):
+class FAQSerializer(SparseFieldsetSerializer):
     class Meta:
         model = FAQ
         fields = '__all__'
 
-class TestimonialSubmissionSerializer(serializers.ModelSerializer):
+class TestimonialSubmissionSerializer(SparseFieldsetSerializer):
     class Meta:
         model = TestimonialSubmission
         fields = '__all__'
@@ -0,0 +1,44 @@
+from functools import partial
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .cache import invalidate_model
+from .images import IMAGE_FIELDS, image_deleted, image_saved
+from .maintenance import write_maintenance_state
+from .models import SiteSettings
+from .search import KIND_FOR_MODEL, index_instance, remove_instance
+
+
+def content_changed(sender, **kwargs):
+    transaction.on_commit(partial(invalidate_model, sender))
+
+
+def site_settings_saved(sender, instance, **kwargs):
+    transaction.on_commit(partial(write_maintenance_state, instance.maintenance_mode))
+
+
+def site_settings_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(write_maintenance_state, False))
+
+
+def searchable_saved(sender, instance, **kwargs):
+    # Same transaction as the write, so the index can't drift from the rows
+    index_instance(instance)
+
+
+def searchable_deleted(sender, instance, **kwargs):
+    remove_instance(instance)
+
+
+def connect_signals():
+    for model in apps.get_app_config('content').get_models():
+        post_save.connect(content_changed, sender=model, dispatch_uid=f'content_changed_save_{model.__name__}')
+        post_delete.connect(content_changed, sender=model, dispatch_uid=f'content_changed_delete_{model.__name__}')
+    post_save.connect(site_settings_saved, sender=SiteSettings, dispatch_uid='site_settings_saved')
+    post_delete.connect(site_settings_deleted, sender=SiteSettings, dispatch_uid='site_settings_deleted')
+    for model in KIND_FOR_MODEL:
+        post_save.connect(searchable_saved, sender=model, dispatch_uid=f'searchable_saved_{model.__name__}')
+        post_delete.connect(searchable_deleted, sender=model, dispatch_uid=f'searchable_deleted_{model.__name__}')
+    for model in IMAGE_FIELDS:
+        post_save.connect(image_saved, sender=model, dispatch_uid=f'image_saved_{model.__name__}')
+        post_delete.connect(image_deleted, sender=model, dispatch_uid=f'image_deleted_{model.__name__}')
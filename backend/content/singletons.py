@@ -0,0 +1,20 @@
+from .cache import get_generations, model_generation_name
+
+# model -> (generation, instance); one copy per gunicorn worker
+_instances = {}
+
+
+def load_singleton(model):
+    """Return the single row of ``model`` from process memory.
+
+    The copy is reused until the model's generation in the shared cache moves,
+    which happens on commit of any save/delete in any worker.
+    """
+    name = model_generation_name(model)
+    generation = get_generations([name])[name]
+    cached = _instances.get(model)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    instance = model.objects.order_by('pk').first()
+    _instances[model] = (generation, instance)
+    return instance
@@ -0,0 +1,134 @@
+"""Sparse fieldsets: ``?fields=a,b`` keeps only those keys, ``?omit=c`` drops some.
+
+Names are validated against the serializer of the endpoint. Where the rows
+are read per request (admin viewsets, blog list/detail, submissions) the
+queryset is narrowed with ``.only()`` as well; the cached public sections are
+built once for everyone, so there only the JSON is trimmed.
+"""
+from functools import lru_cache, wraps
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+@lru_cache(maxsize=None)
+def serializer_field_names(serializer_class):
+    return tuple(serializer_class().fields)
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class Fieldset:
+    def __init__(self, serializer_class, keep):
+        self.serializer_class = serializer_class
+        self.keep = frozenset(keep)
+
+    @classmethod
+    def from_request(cls, request, serializer_class, extra=()):
+        """The fieldset asked for by ``request``, or None when it asks for everything."""
+        fields, omit = _split(request.GET.get('fields')), _split(request.GET.get('omit'))
+        if not fields and not omit:
+            return None
+        available = serializer_field_names(serializer_class) + tuple(extra)
+        unknown = [name for name in fields + omit if name not in available]
+        if unknown:
+            model = serializer_class.Meta.model.__name__
+            raise ValidationError({'error': f'Unknown field(s) for {model}: {", ".join(unknown)}'})
+        keep = set(fields or available) - set(omit)
+        return cls(serializer_class, keep)
+
+    def filter_fields(self, fields):
+        for name in list(fields):
+            if name not in self.keep:
+                fields.pop(name)
+        return fields
+
+    def trim(self, data):
+        if isinstance(data, list):
+            return [self.trim(item) for item in data]
+        if not isinstance(data, dict):
+            return data
+        trimmed = {key: value for key, value in data.items() if key in self.keep}
+        if isinstance(trimmed.get('children'), list):
+            trimmed['children'] = self.trim(trimmed['children'])
+        return trimmed
+
+    def columns(self):
+        """Model columns the kept fields read, or None if one of them can't be mapped."""
+        model = self.serializer_class.Meta.model
+        serializer_fields = self.serializer_class().fields
+        columns = {model._meta.pk.name}
+        for name in self.keep:
+            field = serializer_fields.get(name)
+            if field is None:
+                continue  # an extra key added by the view, not read from the row
+            if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+                return None
+            column = field.source.split('.')[0]
+            try:
+                model_field = model._meta.get_field(column)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            columns.add(column)
+        return columns
+
+    def restrict(self, queryset, required=()):
+        """Narrow ``queryset`` to the kept columns plus ``required`` (e.g. ordering keys)."""
+        columns = self.columns()
+        return queryset.only(*columns, *required) if columns else queryset
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """ModelSerializer that drops the fields excluded by ``context['fieldset']``."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        return fieldset.filter_fields(fields) if fieldset else fields
+
+
+class SparseFieldsetViewSetMixin:
+    """Apply ``?fields=``/``?omit=`` to the queryset and serializer of GET requests."""
+
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = None
+            if self.request is not None and self.request.method in ('GET', 'HEAD'):
+                self._fieldset = Fieldset.from_request(self.request, self.get_serializer_class())
+        return self._fieldset
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fieldset = self.get_fieldset()
+        return fieldset.restrict(queryset) if fieldset else queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
+
+
+def sparse_fieldset(serializer_class, extra=(), results_key=None):
+    """Apply ``?fields=``/``?omit=`` to a function view's response data.
+
+    Goes inside ``api_view``. The parsed fieldset is available to the view as
+    ``request.fieldset`` for narrowing its own queryset. ``results_key`` names
+    the list to trim when the items are wrapped in an envelope.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            request.fieldset = Fieldset.from_request(request, serializer_class, extra)
+            response = view(request, *args, **kwargs)
+            if request.fieldset and response.status_code == 200:
+                if results_key:
+                    response.data[results_key] = request.fieldset.trim(response.data[results_key])
+                else:
+                    response.data = request.fieldset.trim(response.data)
+            return response
+        return wrapped
+    return decorator
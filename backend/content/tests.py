@@ -0,0 +1,44 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from .menu import sync_menu
+from .models import MenuItem
+
+
+class SyncMenuTests(TestCase):
+    def test_new_items_without_ids_stay_top_level(self):
+        sync_menu([
+            {'name': 'A', 'url': '/a', 'order': 1},
+            {'name': 'B', 'url': '/b', 'order': 2, 'parent': None},
+            {'name': 'C', 'url': '/c', 'order': 3},
+        ])
+        self.assertEqual(
+            list(MenuItem.objects.order_by('order').values_list('name', 'parent')),
+            [('A', None), ('B', None), ('C', None)],
+        )
+
+    def test_new_child_of_new_parent(self):
+        sync_menu([
+            {'id': 'new-1', 'name': 'Services', 'url': '/services', 'order': 1},
+            {'name': 'Web', 'url': '/services/web', 'order': 2, 'parent': 'new-1'},
+            {'name': 'About', 'url': '/about', 'order': 3},
+        ])
+        services = MenuItem.objects.get(name='Services')
+        self.assertEqual(MenuItem.objects.get(name='Web').parent, services)
+        self.assertIsNone(services.parent)
+        self.assertIsNone(MenuItem.objects.get(name='About').parent)
+
+    def test_parent_cycle_is_rejected(self):
+        sync_menu([
+            {'id': 'new-1', 'name': 'A', 'url': '/a', 'order': 1},
+            {'id': 'new-2', 'name': 'B', 'url': '/b', 'order': 2},
+        ])
+        a, b = MenuItem.objects.order_by('order')
+        with self.assertRaises(ValidationError):
+            sync_menu([
+                {'id': a.pk, 'name': 'A', 'url': '/a', 'order': 1, 'parent': b.pk},
+                {'id': b.pk, 'name': 'B', 'url': '/b', 'order': 2, 'parent': a.pk},
+            ])
+        self.assertEqual(
+            list(MenuItem.objects.order_by('order').values_list('name', 'parent')),
+            [('A', None), ('B', None)],
+        )
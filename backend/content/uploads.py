@@ -0,0 +1,83 @@
+"""Image backend for ``ckeditor_uploader`` (see ``CKEDITOR_IMAGE_BACKEND``).
+
+Uploads are stored as ``<CKEDITOR_UPLOAD_PATH>/<hash[:2]>/<hash>.<ext>``,
+named after the SHA-256 of the uploaded bytes, so re-uploading an image
+reuses the existing file. New images are rotated per their EXIF
+orientation, stripped of metadata, capped at CKEDITOR_UPLOAD_MAX_DIMENSION
+and recompressed. ``gc_ckeditor_uploads`` removes the ones no blog post uses.
+"""
+import hashlib
+import os
+import re
+from io import BytesIO
+from urllib.parse import unquote
+from django.conf import settings
+from django.core.files.base import ContentFile
+from ckeditor_uploader import utils
+from ckeditor_uploader.backends import PillowBackend
+from PIL import Image
+from .images import encode_image, prepare_image
+
+# Source format -> stored format; anything else is kept lossless as PNG
+OUTPUT_FORMATS = {'JPEG': 'jpeg', 'MPO': 'jpeg'}
+EXTENSIONS = {'jpeg': 'jpg', 'png': 'png'}
+
+
+def upload_name(digest, ext):
+    return os.path.join(settings.CKEDITOR_UPLOAD_PATH, digest[:2], f'{digest[:32]}.{ext}')
+
+
+def referenced_uploads(html):
+    """Storage names of the uploads linked from an HTML fragment."""
+    prefix = re.escape(settings.MEDIA_URL) + '(' + re.escape(settings.CKEDITOR_UPLOAD_PATH) + r'[^"\'\s)?#<>]+)'
+    return {unquote(name) for name in re.findall(prefix, html or '')}
+
+
+class ContentUploadBackend(PillowBackend):
+    def _read(self):
+        self.file_object.seek(0)
+        data = self.file_object.read()
+        self.file_object.seek(0)
+        return data
+
+    def _optimize(self, image, fmt):
+        image = prepare_image(image)
+        limit = settings.CKEDITOR_UPLOAD_MAX_DIMENSION
+        image.thumbnail((limit, limit), Image.LANCZOS)
+        # Re-encoding without exif= drops EXIF/GPS metadata
+        return encode_image(image, fmt, quality=settings.CKEDITOR_IMAGE_QUALITY)
+
+    def _store(self, name, data):
+        saved = self.storage_engine.save(name, ContentFile(data))
+        if saved != name:
+            # A concurrent identical upload got there first; keep theirs
+            self.storage_engine.delete(saved)
+        return name
+
+    def save_as(self, filepath):
+        data = self._read()
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.is_image:
+            ext = os.path.splitext(filepath)[1].lstrip('.').lower() or 'bin'
+            name = upload_name(digest, ext)
+            return name if self.storage_engine.exists(name) else self._store(name, data)
+
+        image = Image.open(BytesIO(data))
+        if getattr(image, 'is_animated', False):
+            # Re-encoding would drop the animation; dedupe the original as is
+            name = upload_name(digest, 'gif' if image.format == 'GIF' else image.format.lower())
+            return name if self.storage_engine.exists(name) else self._store(name, data)
+
+        fmt = OUTPUT_FORMATS.get(image.format, 'png')
+        name = upload_name(digest, EXTENSIONS[fmt])
+        if self.storage_engine.exists(name):
+            return name
+        optimized = self._optimize(image, fmt)
+        self._store(name, optimized)
+        self.create_thumbnail(BytesIO(optimized), name)
+        return name
+
+    def create_thumbnail(self, file_object, file_path):
+        if self.storage_engine.exists(utils.get_thumb_filename(file_path)):
+            return
+        return super().create_thumbnail(file_object, file_path)
@@ -31,6 +31,7 @@ router.register('faqs', views.FAQViewSet)
 urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('site-settings/', views.site_settings_view, name='site-settings'),
+    path('bundles/<slug:name>/', views.bundle_view, name='bundle'),
     path('menu-items/', views.menu_items_view, name='menu-items'),
     path('hero-sections/', views.hero_sections_view, name='hero-sections'),
     path('color-palette/', views.color_palette_view, name='color-palette'),
@@ -48,6 +49,8 @@ urlpatterns = [
     path('contact-info/', views.contact_info_view, name='contact-info'),
     path('contact-section/', views.contact_section_view, name='contact-section'),
     path('blog-posts/', views.blog_posts_view, name='blog-posts'),
+    path('blogs/', views.blog_list_view, name='blog-list'),
+    path('blogs/<slug:slug>/', views.blog_detail_view, name='blog-detail'),
     path('blogs-section/', views.blogs_section_view, name='blogs-section'),
     path('team-members/', views.team_members_view, name='team-members'),
     path('team-section/', views.team_section_view, name='team-section'),
@@ -56,6 +59,8 @@ urlpatterns = [
     path('contact-submissions/', views.contact_submissions_view, name='contact-submissions'),
     path('testimonial-submissions/', views.testimonial_submissions_view, name='testimonial-submissions'),
     path('faqs/', views.faqs_view, name='faqs'),
+    path('search/', views.search_view, name='search'),
+    path('icons/sprite.svg', views.icon_sprite_view, name='icon-sprite'),
     path('admin/about-section/', views.admin_about_section_view, name='admin-about-section'),
     path('admin/services-section/', views.admin_services_section_view, name='admin-services-section'),
     path('admin/testimonials-section/', views.admin_testimonials_section_view, name='admin-testimonials-section'),
@@ -1,12 +1,43 @@
+from pathlib import Path
+from PIL import Image
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import redirect
+from django.conf import settings as django_settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import *
 from .serializers import *
+from .bundles import BUNDLES, bundle_sections, get_bundle
+from .cache import cached_endpoint, get_section
+from .icons import ICON_SECTIONS, get_sprite, with_icon_refs
+from .maintenance import maintenance_status_body
+from .menu import menu_tree, sync_menu
+from .pagination import keyset_page
+from .resize import CONTENT_TYPES, open_resized, output_formats, snap
+from .search import SEARCH_MODELS, search
+from .sparse import SparseFieldsetViewSetMixin, sparse_fieldset
+
+BLOG_PAGE_SIZE = 6
+MAX_BLOG_PAGE_SIZE = 50
+BLOG_CARD_COLUMNS = ('id', 'title', 'excerpt', 'image', 'image_meta', 'category', 'slug', 'date_published')
+SEARCH_DEPENDENCIES = ('blog_posts', 'projects', 'services', 'faqs')
+SPRITE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def icon_section(request, name):
+    # ?icons=sprite swaps inline icon_svg markup for references into the sprite
+    data = get_section(name)
+    if name in ICON_SECTIONS and request.GET.get('icons') == 'sprite':
+        return with_icon_refs(data)
+    return data
 
 @api_view(['GET'])
 def dashboard_redirect_view(request):
@@ -29,88 +60,60 @@ def login_view(request):
         })
     return Response({'error': 'Invalid credentials'}, status=400)
 
+@cached_endpoint('site_settings')
 @api_view(['GET'])
+@sparse_fieldset(SiteSettingsSerializer)
 def site_settings_view(request):
-    settings = SiteSettings.objects.first()
-    if settings:
-        serializer = SiteSettingsSerializer(settings)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('site_settings'))
 
+@cached_endpoint(bundle_sections)
+@api_view(['GET'])
+def bundle_view(request, name):
+    if name not in BUNDLES:
+        return Response({'error': 'Unknown bundle'}, status=404)
+    data = get_bundle(name)
+    if request.GET.get('icons') == 'sprite':
+        data.update({section: with_icon_refs(data[section]) for section in ICON_SECTIONS if section in data})
+    return Response(data)
+
+@cached_endpoint('menu_items')
 @api_view(['GET'])
+@sparse_fieldset(MenuItemSerializer)
 def menu_items_view(request):
-    items = MenuItem.objects.filter(is_active=True).order_by('order')
-    serializer = MenuItemSerializer(items, many=True)
-    return Response(serializer.data)
+    return Response(get_section('menu_items'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_menu_items_view(request):
     try:
-        # Clear existing menu items
-        MenuItem.objects.all().delete()
-        
-        # Create parent items first
-        parent_items = [item for item in request.data if not item.get('parent')]
-        child_items = [item for item in request.data if item.get('parent')]
-        
-        # Create parent items
-        created_parents = {}
-        for item_data in parent_items:
-            menu_item = MenuItem.objects.create(
-                name=item_data['name'],
-                url=item_data['url'],
-                order=item_data['order'],
-                parent=None,
-                is_active=True
-            )
-            created_parents[item_data.get('id')] = menu_item
-        
-        # Create child items
-        for item_data in child_items:
-            parent_id = item_data.get('parent')
-            parent_obj = created_parents.get(parent_id)
-            
-            MenuItem.objects.create(
-                name=item_data['name'],
-                url=item_data['url'],
-                order=item_data['order'],
-                parent=parent_obj,
-                is_active=True
-            )
-        
-        return Response({'success': True})
+        sync_menu(request.data)
+        return Response({'success': True, 'items': menu_tree()})
+    except ValidationError as e:
+        return Response({'error': e.messages[0]}, status=400)
     except Exception as e:
         return Response({'error': str(e)}, status=400)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_site_settings_view(request):
-    settings, created = SiteSettings.objects.get_or_create(id=1)
+    settings = SiteSettings.get_for_update()
     serializer = SiteSettingsSerializer(settings, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
+@cached_endpoint('hero_sections')
 @api_view(['GET'])
+@sparse_fieldset(HeroSectionSerializer)
 def hero_sections_view(request):
-    sections = HeroSection.objects.filter(is_active=True).order_by('order')
-    serializer = HeroSectionSerializer(sections, many=True)
-    return Response(serializer.data)
+    return Response(get_section('hero_sections'))
 
+@cached_endpoint('color_palette')
 @api_view(['GET'])
+@sparse_fieldset(ColorPaletteSerializer)
 def color_palette_view(request):
-    palette = ColorPalette.objects.filter(is_active=True).first()
-    if palette:
-        serializer = ColorPaletteSerializer(palette)
-        return Response(serializer.data)
-    return Response({
-        'primary_color': '#0477BF',
-        'secondary_color': '#012340', 
-        'accent_color': '#FCB316',
-        'light_color': '#048ABF'
-    })
+    return Response(get_section('color_palette'))
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -118,298 +121,298 @@ def delete_all_hero_sections(request):
     HeroSection.objects.all().delete()
     return Response({'success': True})
 
+@cached_endpoint('about_section')
 @api_view(['GET'])
+@sparse_fieldset(AboutSectionSerializer)
 def about_section_view(request):
-    about = AboutSection.objects.first()
-    if about:
-        serializer = AboutSectionSerializer(about)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('about_section'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_about_section_view(request):
-    about, created = AboutSection.objects.get_or_create(id=1)
+    about = AboutSection.get_for_update()
     serializer = AboutSectionSerializer(about, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
+@cached_endpoint('services_section')
 @api_view(['GET'])
+@sparse_fieldset(ServicesSectionSerializer)
 def services_section_view(request):
-    services_section = ServicesSection.objects.first()
-    if services_section:
-        serializer = ServicesSectionSerializer(services_section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('services_section'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_services_section_view(request):
-    services_section, created = ServicesSection.objects.get_or_create(id=1)
+    services_section = ServicesSection.get_for_update()
     serializer = ServicesSectionSerializer(services_section, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
+@cached_endpoint('services')
 @api_view(['GET'])
+@sparse_fieldset(ServiceSerializer, extra=('icon_ref',))
 def services_view(request):
-    services = Service.objects.filter(is_active=True).order_by('order')
-    serializer = ServiceSerializer(services, many=True)
-    return Response(serializer.data)
+    return Response(icon_section(request, 'services'))
 
+@cached_endpoint('projects')
 @api_view(['GET'])
+@sparse_fieldset(ProjectSerializer)
 def projects_view(request):
-    projects = Project.objects.filter(is_active=True).order_by('-created_at')
-    serializer = ProjectSerializer(projects, many=True)
-    return Response(serializer.data)
+    return Response(get_section('projects'))
 
+@cached_endpoint('why_choose_us')
 @api_view(['GET'])
+@sparse_fieldset(WhyChooseUsFeatureSerializer, extra=('icon_ref',))
 def why_choose_us_view(request):
-    features = WhyChooseUsFeature.objects.filter(is_active=True).order_by('order')
-    serializer = WhyChooseUsFeatureSerializer(features, many=True)
-    return Response(serializer.data)
+    return Response(icon_section(request, 'why_choose_us'))
 
+@cached_endpoint('why_choose_us_section')
 @api_view(['GET'])
+@sparse_fieldset(WhyChooseUsSectionSerializer)
 def why_choose_us_section_view(request):
-    section = WhyChooseUsSection.objects.first()
-    if section:
-        serializer = WhyChooseUsSectionSerializer(section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('why_choose_us_section'))
 
+@cached_endpoint('client_logos')
 @api_view(['GET'])
+@sparse_fieldset(ClientLogoSerializer)
 def client_logos_view(request):
-    logos = ClientLogo.objects.filter(is_active=True).order_by('order')
-    serializer = ClientLogoSerializer(logos, many=True)
-    return Response(serializer.data)
+    return Response(get_section('client_logos'))
 
+@cached_endpoint('working_process')
 @api_view(['GET'])
+@sparse_fieldset(WorkingProcessStepSerializer, extra=('icon_ref',))
 def working_process_view(request):
-    steps = WorkingProcessStep.objects.filter(is_active=True).order_by('order')
-    serializer = WorkingProcessStepSerializer(steps, many=True)
-    return Response(serializer.data)
+    return Response(icon_section(request, 'working_process'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_working_process_section_view(request):
-    section, created = WorkingProcessSection.objects.get_or_create(id=1)
+    section = WorkingProcessSection.get_for_update()
     serializer = WorkingProcessSectionSerializer(section, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
+@cached_endpoint('working_process_section')
 @api_view(['GET'])
+@sparse_fieldset(WorkingProcessSectionSerializer)
 def working_process_section_view(request):
-    section = WorkingProcessSection.objects.first()
-    if section:
-        serializer = WorkingProcessSectionSerializer(section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('working_process_section'))
 
-@api_view(['GET'])
-def color_palette_view(request):
-    palette = ColorPalette.objects.filter(is_active=True).first()
-    if palette:
-        serializer = ColorPaletteSerializer(palette)
-        return Response(serializer.data)
-    return Response({
-        'primary_color': '#0477BF',
-        'secondary_color': '#012340', 
-        'accent_color': '#FCB316',
-        'light_color': '#048ABF'
-    })
-
-class ColorPaletteViewSet(viewsets.ModelViewSet):
+class ColorPaletteViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ColorPalette.objects.all()
     serializer_class = ColorPaletteSerializer
     permission_classes = [IsAuthenticated]
 
-class SiteSettingsViewSet(viewsets.ModelViewSet):
+class SiteSettingsViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = SiteSettings.objects.all()
     serializer_class = SiteSettingsSerializer
     permission_classes = [IsAuthenticated]
 
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
     permission_classes = [IsAuthenticated]
 
-class HeroSectionViewSet(viewsets.ModelViewSet):
+class HeroSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = HeroSection.objects.all()
     serializer_class = HeroSectionSerializer
     permission_classes = [IsAuthenticated]
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [IsAuthenticated]
 
+@cached_endpoint('testimonials')
 @api_view(['GET'])
+@sparse_fieldset(TestimonialSerializer)
 def testimonials_view(request):
-    testimonials = Testimonial.objects.filter(is_active=True).order_by('order')
-    serializer = TestimonialSerializer(testimonials, many=True)
-    return Response(serializer.data)
+    return Response(get_section('testimonials'))
 
+@cached_endpoint('testimonials_section')
 @api_view(['GET'])
+@sparse_fieldset(TestimonialsSectionSerializer)
 def testimonials_section_view(request):
-    section = TestimonialsSection.objects.first()
-    if section:
-        serializer = TestimonialsSectionSerializer(section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('testimonials_section'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_testimonials_section_view(request):
-    section, created = TestimonialsSection.objects.get_or_create(id=1)
+    section = TestimonialsSection.get_for_update()
     serializer = TestimonialsSectionSerializer(section, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
-class TestimonialViewSet(viewsets.ModelViewSet):
+class TestimonialViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = Testimonial.objects.all()
     serializer_class = TestimonialSerializer
     permission_classes = [IsAuthenticated]
 
-class TestimonialsSectionViewSet(viewsets.ModelViewSet):
+class TestimonialsSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = TestimonialsSection.objects.all()
     serializer_class = TestimonialsSectionSerializer
     permission_classes = [IsAuthenticated]
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
 
-class AboutSectionViewSet(viewsets.ModelViewSet):
+class AboutSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = AboutSection.objects.all()
     serializer_class = AboutSectionSerializer
     permission_classes = [IsAuthenticated]
 
-class ServicesSectionViewSet(viewsets.ModelViewSet):
+class ServicesSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ServicesSection.objects.all()
     serializer_class = ServicesSectionSerializer
     permission_classes = [IsAuthenticated]
 
-class WhyChooseUsFeatureViewSet(viewsets.ModelViewSet):
+class WhyChooseUsFeatureViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = WhyChooseUsFeature.objects.all()
     serializer_class = WhyChooseUsFeatureSerializer
     permission_classes = [IsAuthenticated]
 
-class WhyChooseUsSectionViewSet(viewsets.ModelViewSet):
+class WhyChooseUsSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = WhyChooseUsSection.objects.all()
     serializer_class = WhyChooseUsSectionSerializer
     permission_classes = [IsAuthenticated]
 
-class ClientLogoViewSet(viewsets.ModelViewSet):
+class ClientLogoViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ClientLogo.objects.all()
     serializer_class = ClientLogoSerializer
     permission_classes = [IsAuthenticated]
 
-class WorkingProcessStepViewSet(viewsets.ModelViewSet):
+class WorkingProcessStepViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = WorkingProcessStep.objects.all()
     serializer_class = WorkingProcessStepSerializer
     permission_classes = [IsAuthenticated]
 
-class WorkingProcessSectionViewSet(viewsets.ModelViewSet):
+class WorkingProcessSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = WorkingProcessSection.objects.all()
     serializer_class = WorkingProcessSectionSerializer
     permission_classes = [IsAuthenticated]
 
+@cached_endpoint('contact_info')
 @api_view(['GET'])
+@sparse_fieldset(ContactInfoSerializer, extra=('icon_ref',))
 def contact_info_view(request):
-    contact_info = ContactInfo.objects.filter(is_active=True).order_by('order')
-    serializer = ContactInfoSerializer(contact_info, many=True)
-    return Response(serializer.data)
+    return Response(icon_section(request, 'contact_info'))
 
+@cached_endpoint('contact_section')
 @api_view(['GET'])
+@sparse_fieldset(ContactSectionSerializer)
 def contact_section_view(request):
-    section = ContactSection.objects.first()
-    if section:
-        serializer = ContactSectionSerializer(section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('contact_section'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_contact_section_view(request):
-    section, created = ContactSection.objects.get_or_create(id=1)
+    section = ContactSection.get_for_update()
     serializer = ContactSectionSerializer(section, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
-class ContactInfoViewSet(viewsets.ModelViewSet):
+class ContactInfoViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ContactInfo.objects.all()
     serializer_class = ContactInfoSerializer
     permission_classes = [IsAuthenticated]
 
-class ContactSectionViewSet(viewsets.ModelViewSet):
+class ContactSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ContactSection.objects.all()
     serializer_class = ContactSectionSerializer
     permission_classes = [IsAuthenticated]
 
+@cached_endpoint('blog_posts')
 @api_view(['GET'])
+@sparse_fieldset(BlogPostSerializer)
 def blog_posts_view(request):
-    posts = BlogPost.objects.filter(is_active=True).order_by('date_published')[:6]
-    serializer = BlogPostSerializer(posts, many=True)
+    return Response(get_section('blog_posts'))
+
+@cached_endpoint('blog_posts')
+@api_view(['GET'])
+@sparse_fieldset(BlogPostCardSerializer, results_key='results')
+def blog_list_view(request):
+    posts = BlogPost.objects.filter(is_active=True).only(*BLOG_CARD_COLUMNS)
+    if request.fieldset:
+        # The keyset cursor is built from these
+        posts = request.fieldset.restrict(posts, required=('date_published',))
+    try:
+        page_size = max(1, min(int(request.GET.get('page_size', BLOG_PAGE_SIZE)), MAX_BLOG_PAGE_SIZE))
+        posts, next_cursor = keyset_page(posts, request.GET.get('cursor'), page_size)
+    except ValueError:
+        return Response({'error': 'Invalid cursor or page_size'}, status=400)
+    serializer = BlogPostCardSerializer(posts, many=True, context={'fieldset': request.fieldset})
+    return Response({'results': serializer.data, 'next_cursor': next_cursor})
+
+@cached_endpoint('blog_posts')
+@api_view(['GET'])
+@sparse_fieldset(BlogPostDetailSerializer)
+def blog_detail_view(request, slug):
+    posts = BlogPost.objects.filter(slug=slug, is_active=True)
+    if request.fieldset:
+        posts = request.fieldset.restrict(posts)
+    post = posts.first()
+    if not post:
+        return Response({'error': 'Blog post not found'}, status=404)
+    serializer = BlogPostDetailSerializer(post, context={'fieldset': request.fieldset})
     return Response(serializer.data)
 
+@cached_endpoint('blogs_section')
 @api_view(['GET'])
+@sparse_fieldset(BlogsSectionSerializer)
 def blogs_section_view(request):
-    section = BlogsSection.objects.first()
-    if section:
-        serializer = BlogsSectionSerializer(section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('blogs_section'))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def admin_blogs_section_view(request):
-    section, created = BlogsSection.objects.get_or_create(id=1)
+    section = BlogsSection.get_for_update()
     serializer = BlogsSectionSerializer(section, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data)
     return Response(serializer.errors, status=400)
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = BlogPost.objects.all()
     serializer_class = BlogPostSerializer
     permission_classes = [IsAuthenticated]
 
-class BlogsSectionViewSet(viewsets.ModelViewSet):
+class BlogsSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = BlogsSection.objects.all()
     serializer_class = BlogsSectionSerializer
     permission_classes = [IsAuthenticated]
 
+@cached_endpoint('team_members')
 @api_view(['GET'])
+@sparse_fieldset(TeamMemberSerializer)
 def team_members_view(request):
-    members = TeamMember.objects.filter(is_active=True).order_by('order')
-    serializer = TeamMemberSerializer(members, many=True)
-    return Response(serializer.data)
+    return Response(get_section('team_members'))
 
+@cached_endpoint('team_section')
 @api_view(['GET'])
+@sparse_fieldset(TeamSectionSerializer)
 def team_section_view(request):
-    section = TeamSection.objects.first()
-    if section:
-        serializer = TeamSectionSerializer(section)
-        return Response(serializer.data)
-    return Response({})
+    return Response(get_section('team_section'))
 
-class TeamMemberViewSet(viewsets.ModelViewSet):
+class TeamMemberViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
     permission_classes = [IsAuthenticated]
 
-class TeamSectionViewSet(viewsets.ModelViewSet):
+class TeamSectionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = TeamSection.objects.all()
     serializer_class = TeamSectionSerializer
     permission_classes = [IsAuthenticated]
@@ -424,34 +427,120 @@ def contact_submit_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@sparse_fieldset(ContactSubmissionSerializer)
 def contact_submissions_view(request):
     submissions = ContactSubmission.objects.all().order_by('-submitted_at')
-    serializer = ContactSubmissionSerializer(submissions, many=True)
+    if request.fieldset:
+        submissions = request.fieldset.restrict(submissions)
+    serializer = ContactSubmissionSerializer(submissions, many=True, context={'fieldset': request.fieldset})
     return Response(serializer.data)
 
-class ContactSubmissionViewSet(viewsets.ModelViewSet):
+class ContactSubmissionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ContactSubmission.objects.all()
     serializer_class = ContactSubmissionSerializer
     permission_classes = [IsAuthenticated]
 
+@cached_endpoint('faqs')
 @api_view(['GET'])
+@sparse_fieldset(FAQSerializer)
 def faqs_view(request):
-    faqs = FAQ.objects.filter(is_active=True).order_by('order')
-    serializer = FAQSerializer(faqs, many=True)
-    return Response(serializer.data)
+    return Response(get_section('faqs'))
+
+@cached_endpoint(SEARCH_DEPENDENCIES)
+@api_view(['GET'])
+def search_view(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Query parameter q is required'}, status=400)
+    kinds = [kind for kind in request.GET.get('type', '').split(',') if kind in SEARCH_MODELS]
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 50))
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=400)
+    return Response({'query': query, 'results': search(query, kinds=kinds, limit=limit)})
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def toggle_maintenance_mode(request):
-    settings, created = SiteSettings.objects.get_or_create(id=1)
+    settings = SiteSettings.get_for_update()
     settings.maintenance_mode = not settings.maintenance_mode
     settings.save()
     return Response({'maintenance_mode': settings.maintenance_mode})
 
-@api_view(['GET'])
+@require_safe
 def maintenance_status_view(request):
-    settings = SiteSettings.objects.first()
-    return Response({'maintenance_mode': settings.maintenance_mode if settings else False})
+    # Hit by the Next.js middleware on every navigation: plain Django view,
+    # served from the state file without DRF or the database
+    response = HttpResponse(maintenance_status_body(), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=django_settings.MAINTENANCE_STATUS_MAX_AGE)
+    return response
+
+@require_safe
+def icon_sprite_view(request):
+    """SVG sprite of every active icon; immutable when requested with its current ``?v=``."""
+    version, body = get_sprite()
+    etag = f'"{version}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='image/svg+xml')
+    response['ETag'] = etag
+    if request.GET.get('v') == version:
+        patch_cache_control(response, public=True, max_age=SPRITE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+@require_safe
+def media_resize_view(request, path):
+    """Serve ``MEDIA_ROOT/<path>`` resized: ``?w=640&format=webp&q=80``.
+
+    ``w`` and ``q`` are rounded up to IMAGE_RESIZE_WIDTHS / IMAGE_RESIZE_QUALITIES.
+    """
+    try:
+        source = Path(safe_join(django_settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not source.is_file():
+        raise Http404
+
+    fmt = request.GET.get('format', 'webp').lower()
+    if fmt == 'jpg':
+        fmt = 'jpeg'
+    if fmt not in output_formats():
+        return JsonResponse({'error': f'format must be one of {", ".join(output_formats())}'}, status=400)
+    try:
+        width = int(request.GET.get('w', django_settings.IMAGE_RESIZE_WIDTHS[-1]))
+        quality = int(request.GET.get('q', 80))
+    except ValueError:
+        return JsonResponse({'error': 'w and q must be integers'}, status=400)
+    if width < 1 or not 1 <= quality <= 100:
+        return JsonResponse({'error': 'w must be positive and q 1-100'}, status=400)
+    width = snap(width, django_settings.IMAGE_RESIZE_WIDTHS)
+    quality = snap(quality, django_settings.IMAGE_RESIZE_QUALITIES)
+
+    try:
+        key, cached, cached_file = open_resized(source, width, fmt, quality)
+    except (OSError, Image.DecompressionBombError, ValueError):
+        return JsonResponse({'error': 'File is not a supported image'}, status=400)
+
+    etag = f'"{key}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        cached_file.close()
+    else:
+        if django_settings.IMAGE_RESIZE_ACCEL_PREFIX:
+            # nginx streams the file itself from its internal location
+            cached_file.close()
+            response = HttpResponse(content_type=CONTENT_TYPES[fmt])
+            response['X-Accel-Redirect'] = django_settings.IMAGE_RESIZE_ACCEL_PREFIX + str(
+                cached.relative_to(django_settings.IMAGE_RESIZE_CACHE_DIR)
+            )
+        else:
+            # FileResponse uses the server's wsgi.file_wrapper (sendfile) when there is one
+            response = FileResponse(cached_file, content_type=CONTENT_TYPES[fmt])
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=django_settings.IMAGE_RESIZE_MAX_AGE)
+    return response
 
 @api_view(['POST'])
 def testimonial_submit_view(request):
@@ -463,17 +552,20 @@ def testimonial_submit_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@sparse_fieldset(TestimonialSubmissionSerializer)
 def testimonial_submissions_view(request):
     submissions = TestimonialSubmission.objects.all().order_by('-submitted_at')
-    serializer = TestimonialSubmissionSerializer(submissions, many=True)
+    if request.fieldset:
+        submissions = request.fieldset.restrict(submissions)
+    serializer = TestimonialSubmissionSerializer(submissions, many=True, context={'fieldset': request.fieldset})
     return Response(serializer.data)
 
-class TestimonialSubmissionViewSet(viewsets.ModelViewSet):
+class TestimonialSubmissionViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = TestimonialSubmission.objects.all()
     serializer_class = TestimonialSubmissionSerializer
     permission_classes = [IsAuthenticated]
 
-class FAQViewSet(viewsets.ModelViewSet):
+class FAQViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = FAQ.objects.all()
     serializer_class = FAQSerializer
     permission_classes = [IsAuthenticated]
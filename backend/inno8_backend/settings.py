@@ -71,6 +71,57 @@ DATABASES = {
     }
 }
 
+# Shared between gunicorn workers so content cache invalidation reaches all of them
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    }
+}
+
+# Small state files shared by all workers (e.g. the maintenance flag)
+CONTENT_STATE_DIR = config('CONTENT_STATE_DIR', default=str(BASE_DIR / 'state'))
+MAINTENANCE_STATUS_MAX_AGE = config('MAINTENANCE_STATUS_MAX_AGE', default=5, cast=int)
+# Cached public responses smaller than this are not stored pre-compressed
+RESPONSE_COMPRESSION_MIN_BYTES = config('RESPONSE_COMPRESSION_MIN_BYTES', default=1024, cast=int)
+
+# How track_visit stores page visits (see analytics.ingest): 'buffer' batches them
+# per worker, 'segments' appends them to NDJSON segment files loaded by
+# `manage.py compact_visit_segments`, 'database' inserts each one directly
+ANALYTICS_INGEST = config('ANALYTICS_INGEST', default='buffer')
+ANALYTICS_BUFFER_SIZE = config('ANALYTICS_BUFFER_SIZE', default=10000, cast=int)
+ANALYTICS_BATCH_SIZE = config('ANALYTICS_BATCH_SIZE', default=500, cast=int)
+ANALYTICS_FLUSH_INTERVAL = config('ANALYTICS_FLUSH_INTERVAL', default=2.0, cast=float)
+ANALYTICS_SEGMENT_DIR = config('ANALYTICS_SEGMENT_DIR', default=str(BASE_DIR / 'analytics-segments'))
+ANALYTICS_SEGMENT_MAX_BYTES = config('ANALYTICS_SEGMENT_MAX_BYTES', default=64 * 1024 * 1024, cast=int)
+ANALYTICS_SEGMENT_MAX_AGE = config('ANALYTICS_SEGMENT_MAX_AGE', default=300, cast=int)
+ANALYTICS_SEGMENT_FSYNC_INTERVAL = config('ANALYTICS_SEGMENT_FSYNC_INTERVAL', default=1.0, cast=float)
+
+# Range table for offline visitor geolocation, built by `manage.py import_geoip`
+GEOIP_DATABASE = config('GEOIP_DATABASE', default=str(BASE_DIR / 'geoip' / 'ranges.bin'))
+
+# Directory nginx serves pre-rendered public JSON from; empty disables the export on save
+STATIC_EXPORT_ROOT = config('STATIC_EXPORT_ROOT', default='')
+
+# Responsive WebP/AVIF derivatives generated in the background for uploaded images
+IMAGE_VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+IMAGE_VARIANT_FORMATS = ('avif', 'webp')
+IMAGE_VARIANT_WORKERS = config('IMAGE_VARIANT_WORKERS', default=2, cast=int)
+IMAGE_VARIANT_QUEUE_SIZE = config('IMAGE_VARIANT_QUEUE_SIZE', default=100, cast=int)
+
+# /media/resize/ on-the-fly transforms, kept in a size-bounded LRU disk cache
+IMAGE_RESIZE_CACHE_DIR = config('IMAGE_RESIZE_CACHE_DIR', default=str(BASE_DIR / 'resize-cache'))
+IMAGE_RESIZE_CACHE_MAX_BYTES = config('IMAGE_RESIZE_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+# Requested widths and qualities are rounded up to these steps, bounding the cache entries per image
+IMAGE_RESIZE_WIDTHS = (160, 320, 480, 640, 960, 1280, 1600, 1920, 2560)
+IMAGE_RESIZE_QUALITIES = (50, 65, 80, 90)
+IMAGE_RESIZE_MAX_AGE = config('IMAGE_RESIZE_MAX_AGE', default=86400, cast=int)
+# Internal nginx location aliased to IMAGE_RESIZE_CACHE_DIR (e.g. /_resized/); empty streams from Django
+IMAGE_RESIZE_ACCEL_PREFIX = config('IMAGE_RESIZE_ACCEL_PREFIX', default='')
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,8 +155,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson-backed; same output as the stock JSON renderer/parser
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'content.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'content.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -118,8 +175,14 @@ SIMPLE_JWT = {
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Origin prefixed to media URLs serialized without a request (cached public sections)
+MEDIA_BASE_URL = config('MEDIA_BASE_URL', default='http://localhost:8010')
 
 CKEDITOR_UPLOAD_PATH = 'uploads/'
+# Content-hash named, EXIF-stripped, size-capped uploads (content/uploads.py)
+CKEDITOR_IMAGE_BACKEND = 'content.uploads.ContentUploadBackend'
+CKEDITOR_UPLOAD_MAX_DIMENSION = 2000
+CKEDITOR_IMAGE_QUALITY = 82
 CKEDITOR_CONFIGS = {
     'default': {
         'toolbar': 'full',
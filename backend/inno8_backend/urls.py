@@ -20,6 +20,7 @@ from django.http import JsonResponse
 from django.conf import settings
 from django.shortcuts import redirect
 from django.conf.urls.static import static
+from content.views import media_resize_view
 
 
 
@@ -42,6 +43,8 @@ urlpatterns = [
 path('ckeditor/', include('ckeditor_uploader.urls')),
 
     path('api/health/', api_health, name='api_health'),
+    # Before the DEBUG media route below, which would otherwise claim /media/resize/
+    path('media/resize/<path:path>', media_resize_view, name='media_resize'),
     path('api/', include('content.urls')),
 	  path('api/analytics/', include('analytics.urls')),
 path('api/newsletter/', include('newsletter.urls')),